@@ -1,15 +1,29 @@
 import os
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
-current_dir = os.path.dirname(__file__)
+current_dir = os.path.dirname(os.path.abspath(__file__))
+_ENV_FILES = (
+    os.path.join(current_dir, '..', '.env.prod'),
+    os.path.join(current_dir, '..', 'fastapi.env'),
+)
 
 
 class Settings(BaseSettings):
     mysql_browser_info_url: str
     controller_base_path: str | None = '/api'
     chromium_executable_path: str | None = None
+    max_browser_sessions: int = 10
+    # 开启后页面不加载图片、字体和音视频，降低截图和直播画面的内存占用与延迟
+    browser_lite_mode: bool = False
+    # GPU 上将验证码模型导出为 TensorRT INT8 引擎，需要提供校准数据集的 yaml；INT8 可能降低小目标的精度，默认关闭
+    captcha_trt_int8: bool = False
+    captcha_trt_calib_data: str | None = None
+    # 使用 torch.compile 编译 PyTorch 验证码模型，启动时多花几秒编译换取之后每次推理更快
+    captcha_torch_compile: bool = False
+    # 同时等待/执行重试的操作数上限，避免大量页面同时失败时重试堆积
+    retry_max_concurrent: int = 16
     model_config = SettingsConfigDict(
-        env_file=(os.path.join(current_dir, '../.env.prod'),os.path.join(current_dir, '../fastapi.env')),
+        env_file=_ENV_FILES,
         case_sensitive=False,
         env_file_encoding='utf-8',
         extra='ignore'
@@ -28,7 +42,7 @@ class CONF:
         """
         路径配置
         """
-        logs = os.path.join(current_dir, './logs')
+        logs = os.path.join(current_dir, 'logs')
 
 
 __all__ = [
@@ -4,6 +4,7 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models.RPA_browser.models import (
     BaseFingerprintBrowserInitParams,
     UserBrowserInfoCreateParams,
+    UserBrowserInfoBulkCreateParams,
     get_session,
     UserBrowserInfoReadParams,
     UserBrowserInfoUpdateParams,
@@ -15,7 +16,7 @@ from app.models.RPA_browser.models import (
 )
 from app.models.router.router_prefix import BrowserRouterPath
 from .base import new_router
-from app.models.response import StandardResponse, success_response, error_response
+from app.models.response import StandardResponse, success_json_response, prebuilt_error_response
 from app.services.RPA_browser.browser_service import BrowserService
 from app.services.RPA_browser.browser_db_service import BrowserDBService
 from app.models.response_code import ResponseCode
@@ -23,10 +24,20 @@ from typing import Union
 
 router = new_router()
 
+# 预先参数化响应模型，保证各路由引用同一个类型对象
+_GenRandFingerprintResp = StandardResponse[BaseFingerprintBrowserInitParams]
+_CreateFingerprintResp = StandardResponse[UserBrowserInfoCreateResp]
+_CreateFingerprintBulkResp = StandardResponse[list[UserBrowserInfoCreateResp]]
+_ReadFingerprintResp = StandardResponse[Union[UserBrowserInfoReadResp, None]]
+_UpdateFingerprintResp = StandardResponse[UserBrowserInfoUpdateResp]
+_DeleteFingerprintResp = StandardResponse[UserBrowserInfoDeleteResp]
+
+_BROWSER_NOT_FOUND = prebuilt_error_response(code=ResponseCode.NOT_FOUND, msg="Browser info not found")
+
 
 @router.post(
     BrowserRouterPath.gen_rand_fingerprint,
-    response_model=StandardResponse[BaseFingerprintBrowserInitParams]
+    response_model=_GenRandFingerprintResp
 )
 def gen_rand_fingerprint_router(
         params: UserBrowserInfoCreateParams = UserBrowserInfoCreateParams()
@@ -38,12 +49,12 @@ def gen_rand_fingerprint_router(
         dict: 包含随机生成的浏览器指纹信息的字典，具体字段由底层 gen_from_browserforge_fingerprint() 函数决定
     """
     fingerprint = BrowserService.gen_rand_fingerprint(params)
-    return success_response(data=fingerprint)
+    return success_json_response(data=fingerprint)
 
 
 @router.post(
     BrowserRouterPath.create_fingerprint,
-    response_model=StandardResponse[UserBrowserInfoCreateResp]
+    response_model=_CreateFingerprintResp
 )
 async def create_fingerprint_router(
         params: UserBrowserInfoCreateParams = UserBrowserInfoCreateParams(),
@@ -53,12 +64,27 @@ async def create_fingerprint_router(
     生成随机的浏览器指纹信息
     """
     result = await BrowserDBService.create_fingerprint(params, session)
-    return success_response(data=result)
+    return success_json_response(data=result)
+
+
+@router.post(
+    BrowserRouterPath.create_fingerprint_bulk,
+    response_model=_CreateFingerprintBulkResp
+)
+async def create_fingerprint_bulk_router(
+        params: UserBrowserInfoBulkCreateParams,
+        session: AsyncSession = Depends(get_session)
+):
+    """
+    批量生成随机的浏览器指纹信息
+    """
+    result = await BrowserDBService.create_fingerprints_bulk(params, session)
+    return success_json_response(data=result)
 
 
 @router.post(
     BrowserRouterPath.read_fingerprint,
-    response_model=StandardResponse[Union[UserBrowserInfoReadResp, None]]
+    response_model=_ReadFingerprintResp
 )
 async def read_fingerprint_router(
         params: UserBrowserInfoReadParams,
@@ -69,13 +95,13 @@ async def read_fingerprint_router(
     """
     result = await BrowserDBService.read_fingerprint(params, session)
     if result is None:
-        return error_response(code=ResponseCode.NOT_FOUND, msg="Browser info not found")
-    return success_response(data=result)
+        return _BROWSER_NOT_FOUND
+    return success_json_response(data=result)
 
 
 @router.post(
     BrowserRouterPath.update_fingerprint,
-    response_model=StandardResponse[UserBrowserInfoUpdateResp]
+    response_model=_UpdateFingerprintResp
 )
 async def update_fingerprint_router(
         params: UserBrowserInfoUpdateParams,
@@ -83,9 +109,9 @@ async def update_fingerprint_router(
 ):
     is_success = await BrowserDBService.update_fingerprint(params, session)
     if not is_success:
-        return error_response(code=ResponseCode.NOT_FOUND, msg="Browser info not found")
+        return _BROWSER_NOT_FOUND
 
-    return success_response(data=UserBrowserInfoUpdateResp(
+    return success_json_response(data=UserBrowserInfoUpdateResp(
         browser_token=params.browser_token,
         is_success=True
     ))
@@ -93,7 +119,7 @@ async def update_fingerprint_router(
 
 @router.post(
     BrowserRouterPath.delete_fingerprint,
-    response_model=StandardResponse[UserBrowserInfoDeleteResp]
+    response_model=_DeleteFingerprintResp
 )
 async def delete_fingerprint_router(
         params: UserBrowserInfoDeleteParams,
@@ -101,9 +127,9 @@ async def delete_fingerprint_router(
 ):
     is_success = await BrowserDBService.delete_fingerprint(params, session)
     if not is_success:
-        return error_response(code=ResponseCode.NOT_FOUND, msg="Browser info not found")
+        return _BROWSER_NOT_FOUND
 
-    return success_response(data=UserBrowserInfoDeleteResp(
+    return success_json_response(data=UserBrowserInfoDeleteResp(
         browser_token=params.browser_token,
         is_success=True
     ))
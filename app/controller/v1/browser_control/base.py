@@ -5,4 +5,7 @@ from app.utils.controller.router_path import gen_api_router
 
 
 def new_router(dependencies=None) -> APIRouter:
-    return gen_api_router(browser_control_router, dependencies)
+    """
+    每次调用都构建新的 APIRouter，路由对象可变，不能在不同控制器之间共享；prefix 的拼接已在 gen_router_prefix 中缓存
+    """
+    return gen_api_router(browser_control_router, list(dependencies) if dependencies else None)
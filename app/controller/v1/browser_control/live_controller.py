@@ -1,6 +1,6 @@
 from app.config import settings
 from app.controller.v1.browser_control.base import new_router
-from app.models.response import StandardResponse, success_response, error_response
+from app.models.response import StandardResponse, success_json_response, prebuilt_error_response
 from app.models.RPA_browser.models import (
     BrowserOpenUrlParams,
     BrowserOpenUrlResp,
@@ -10,11 +10,11 @@ from app.models.RPA_browser.models import (
     BrowserReleaseResp,
     LiveCreateParams,
     LiveCreateResp,
+    ScreenshotEncodingEnum,
 )
 from app.models.router.router_prefix import BrowserControlRouterPath
-import uuid
 from fastapi import WebSocket, Query
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, Response
 
 from app.models.response_code import ResponseCode
 from app.services.RPA_browser.live_service import LiveService
@@ -22,64 +22,88 @@ from app.services.RPA_browser.browser_service import BrowserService
 
 router = new_router()
 
+# 预先参数化响应模型，保证各路由引用同一个类型对象
+_OpenUrlResp = StandardResponse[BrowserOpenUrlResp]
+_ScreenshotResp = StandardResponse[BrowserScreenshotResp]
+_ReleaseResp = StandardResponse[BrowserReleaseResp]
+_LiveCreateResp = StandardResponse[LiveCreateResp]
+_DictResp = StandardResponse[dict]
+
+_BROWSER_TOKEN_NOT_FOUND = prebuilt_error_response(code=ResponseCode.NOT_FOUND, msg="browser_token not found")
+_LIVE_ID_NOT_FOUND = prebuilt_error_response(code=ResponseCode.NOT_FOUND, msg="live_id not found")
+
+_LIVE_VIEW_URL_PREFIX = f"{settings.controller_base_path}{BrowserControlRouterPath.live_view.value}?live_id="
+
 
 @router.post(
     BrowserControlRouterPath.open_url,
-    response_model=StandardResponse[BrowserOpenUrlResp]
+    response_model=_OpenUrlResp
 )
 async def open_url_router(
         params: BrowserOpenUrlParams,
 ):
     resp = await BrowserService.open_url(params)
-    return success_response(data=resp)
+    return success_json_response(data=resp)
 
 
 @router.post(
     BrowserControlRouterPath.screenshot,
-    response_model=StandardResponse[BrowserScreenshotResp]
+    response_model=_ScreenshotResp,
+    responses={200: {'content': {'image/png': {}, 'image/jpeg': {}}}}
 )
 async def screenshot_router(
         params: BrowserScreenshotParams,
+        encoding: ScreenshotEncodingEnum = Query(ScreenshotEncodingEnum.binary),
 ):
-    resp = await BrowserService.screenshot(params)
-    return success_response(data=resp)
+    """
+    默认直接返回图片二进制，encoding=base64 时返回包含 base64 的 JSON
+    """
+    if encoding == ScreenshotEncodingEnum.base64:
+        resp = await BrowserService.screenshot(params)
+        return success_json_response(data=resp)
+    image_bytes = await BrowserService.screenshot_bytes(params)
+    return Response(
+        content=image_bytes,
+        media_type=f"image/{params.type or 'png'}",
+        headers={'X-Browser-Token': str(params.browser_token)}
+    )
 
 
 @router.post(
     BrowserControlRouterPath.release,
-    response_model=StandardResponse[BrowserReleaseResp]
+    response_model=_ReleaseResp
 )
 async def release_router(
         params: BrowserReleaseParams,
 ):
     resp = await BrowserService.release(params)
-    return success_response(data=resp)
+    return success_json_response(data=resp)
 
 
 @router.post(
     BrowserControlRouterPath.live_create,
-    response_model=StandardResponse[LiveCreateResp]
+    response_model=_LiveCreateResp
 )
 async def live_create_router(
         params: LiveCreateParams,
 ):
     exists = await LiveService.validate_browser_token(params.browser_token)
     if not exists:
-        return error_response(code=ResponseCode.NOT_FOUND, msg="browser_token not found")
+        return _BROWSER_TOKEN_NOT_FOUND
     live_id = await LiveService.create_live_session(params.browser_token, headless=params.headless)
-    live_url = f"{settings.controller_base_path}{BrowserControlRouterPath.live_view.value}?live_id={live_id}"
-    return success_response(data=LiveCreateResp(live_id=live_id, live_url=live_url))
+    live_url = _LIVE_VIEW_URL_PREFIX + live_id
+    return success_json_response(data=LiveCreateResp(live_id=live_id, live_url=live_url))
 
 
 @router.get(
     BrowserControlRouterPath.live_view,
-    response_model=StandardResponse[dict]
+    response_model=_DictResp
 )
 async def live_view_router(live_id: str):
     entry = LiveService.get_live_entry(live_id)
     if entry is None:
-        return error_response(code=ResponseCode.NOT_FOUND, msg="live_id not found")
-    return success_response(data={"live_id": live_id, "exists": True})
+        return _LIVE_ID_NOT_FOUND
+    return success_json_response(data={"live_id": live_id, "exists": True})
 
 
 @router.get(
@@ -88,7 +112,7 @@ async def live_view_router(live_id: str):
 async def live_stream_router(live_id: str):
     entry = LiveService.get_live_entry(live_id)
     if entry is None:
-        return error_response(code=ResponseCode.NOT_FOUND, msg="live_id not found")
+        return _LIVE_ID_NOT_FOUND
 
     frame_generator = await LiveService.generate_video_stream(entry)
     return StreamingResponse(frame_generator(), media_type="multipart/x-mixed-replace; boundary=frame")
@@ -96,22 +120,16 @@ async def live_stream_router(live_id: str):
 
 @router.post(
     BrowserControlRouterPath.live_stop,
-    response_model=StandardResponse[dict]
+    response_model=_DictResp
 )
 async def live_stop_router(live_id: str):
     # 获取会话条目以获取browser_token
     entry = LiveService.get_live_entry(live_id)
     if entry is None:
-        return error_response(code=ResponseCode.NOT_FOUND, msg="live_id not found")
-        
-    # 将字符串转换为UUID对象
-    try:
-        browser_token = uuid.UUID(entry.browser_token)
-    except ValueError:
-        return error_response(code=ResponseCode.BAD_REQUEST, msg="Invalid browser_token format")
-        
-    stopped = await LiveService.stop_live_session(browser_token)
-    return success_response(data={"live_id": live_id, "stopped": stopped})
+        return _LIVE_ID_NOT_FOUND
+
+    stopped = await LiveService.stop_live_session(entry.browser_token_uuid)
+    return success_json_response(data={"live_id": live_id, "stopped": stopped})
 
 
 @router.websocket(BrowserControlRouterPath.live_ws)
@@ -120,11 +138,6 @@ async def live_ws(websocket: WebSocket, live_id: str = Query(...)):
     if entry is None:
         await websocket.close(code=4404)
         return
-    try:
-        browser_token = uuid.UUID(entry.browser_token)
-    except Exception:
-        await websocket.close(code=4400)
-        return
     await websocket.accept()
     
     # 通过服务层获取页面
@@ -132,8 +145,15 @@ async def live_ws(websocket: WebSocket, live_id: str = Query(...)):
     
     try:
         while True:
-            msg = await websocket.receive_text()
+            message = await websocket.receive()
+            if message['type'] == 'websocket.disconnect':
+                break
+            LiveService.touch_live_entry(entry)
+            # 文本帧和二进制帧均可，原始数据直接交给 from_json 解析
+            raw = message.get('text')
+            if raw is None:
+                raw = message.get('bytes')
             # 使用服务层处理WebSocket消息
-            await LiveService.handle_websocket_message(websocket, page, msg)
+            await LiveService.handle_websocket_message(websocket, page, raw)
     except Exception:
         pass
\ No newline at end of file
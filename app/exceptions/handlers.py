@@ -1,13 +1,12 @@
 from fastapi import Request
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
-from starlette.responses import JSONResponse
 
-from app.models.response import StandardResponse
+from app.models.response import StandardResponse, PydanticJSONResponse
 from app.models.response_code import ResponseCode
 
 
-async def http_exception_handler(request: Request, exc: StarletteHTTPException) -> JSONResponse:
+async def http_exception_handler(request: Request, exc: StarletteHTTPException) -> PydanticJSONResponse:
     """处理HTTP异常，如404等"""
     if exc.status_code == 404:
         response = StandardResponse(
@@ -23,7 +22,7 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException)
             msg=exc.detail or "Error occurred"
         )
 
-    return JSONResponse(
+    return PydanticJSONResponse(
         content=response.model_dump(),
         status_code=exc.status_code
     )
@@ -1,17 +1,22 @@
 from dataclasses import dataclass
 from datetime import datetime
-from typing import AsyncGenerator, Any
-
-from patchright.async_api import BrowserContext
+from typing import AsyncGenerator, Any, TYPE_CHECKING
 
 from app.services.RPA_browser.base.base_engines import BaseUndetectedPlaywright
 
+if TYPE_CHECKING:
+    from patchright.async_api import BrowserContext
+
 
 @dataclass
 class SessionInfo:
     """会话信息数据类"""
     playwright_instance: BaseUndetectedPlaywright
-    browser_context: BrowserContext
-    browser_generator: AsyncGenerator[BrowserContext, Any]
+    browser_context: "BrowserContext"
+    browser_generator: AsyncGenerator["BrowserContext", Any]
     created_at: datetime
     last_used: float = 0  # 最后使用时间戳
+    heap_ts: float = 0  # 该会话在 LRU 堆中有效条目的时间戳，与堆中条目不一致的即为过期条目
+    pages_served: int = 0  # 当前浏览器上下文已提供的页面次数，用于定期重建上下文
+    pages_in_use: int = 0  # 已借出尚未归还的页面数
+    live_pages: int = 0  # 通过 get_page 获取、尚未关闭的页面数（实时画面等），不为 0 时不重建上下文
@@ -1,24 +1,58 @@
+import sys
 from datetime import datetime
 import uuid
 from enum import StrEnum
+from functools import lru_cache, cached_property
 from typing import Annotated, Any, AsyncGenerator
-from pydantic import model_validator
-from sqlmodel import Field, SQLModel, Enum, Column, select
-from sqlalchemy.ext.asyncio import create_async_engine
+from pydantic import ConfigDict, model_validator
+from sqlmodel import Field, SQLModel, Enum, Column, select, func
+from sqlalchemy import BINARY, TypeDecorator
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
 from sqlmodel.ext.asyncio.session import AsyncSession
 from app.config import settings
 
-engine = create_async_engine(url=settings.mysql_browser_info_url)
+
+@lru_cache(maxsize=1)
+def _get_engine() -> AsyncEngine:
+    # 首次使用时才创建引擎，避免导入模块时就加载数据库驱动和连接池
+    # pool_use_lifo 优先复用最近归还的连接，空闲连接可被 MySQL 超时回收
+    return create_async_engine(
+        url=settings.mysql_browser_info_url,
+        pool_pre_ping=True,
+        pool_use_lifo=True,
+        pool_size=20,
+        max_overflow=30
+    )
 
 
 async def get_session() -> AsyncGenerator[AsyncSession, Any]:
-    async with AsyncSession(engine) as session:
+    async with AsyncSession(_get_engine()) as session:
         yield session
 
 
 Int32 = Annotated[int, Field(ge=-2147483648, le=2147483647)]
 
 
+class BinaryUUID(TypeDecorator):
+    """
+    以 BINARY(16) 存储 UUID，索引比 CHAR(36) 更小、比较更快
+    """
+    impl = BINARY(16)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if not isinstance(value, uuid.UUID):
+            value = uuid.UUID(str(value))
+        return value.bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return uuid.UUID(bytes=value)
+
+
 class PlatformEnum(StrEnum):
     windows = 'windows'
     linux = 'linux'
@@ -32,6 +66,18 @@ class BrowserEnum(StrEnum):
     Vivaldi = 'Vivaldi'
 
 
+class ScreenshotEncodingEnum(StrEnum):
+    binary = 'binary'
+    base64 = 'base64'
+
+
+class PageWaitUntilEnum(StrEnum):
+    load = 'load'
+    domcontentloaded = 'domcontentloaded'
+    networkidle = 'networkidle'
+    commit = 'commit'
+
+
 class BaseFingerprintBrowserInitParams(SQLModel):
     fingerprint: Int32 = Field(...,
                                unique=True,
@@ -66,31 +112,51 @@ class BaseFingerprintBrowserInitParams(SQLModel):
                                      description='http, socks proxy (password authentication not supported)')
 
     @model_validator(mode='after')
-    def check_browser_and_brand_version_consistency(self):
-        browser = self.fingerprint_browser
-        brand_version = self.fingerprint_brand_version
-
-        if (browser is None) != (brand_version is None):
+    def check_paired_fields_consistency(self):
+        # 合并为一个校验器，每次实例化只回调一次
+        if (self.fingerprint_browser is None) != (self.fingerprint_brand_version is None):
             raise ValueError(
                 "fingerprint_browser and fingerprint_brand_version must be both set or both unset."
             )
-        return self
-
-    @model_validator(mode='after')
-    def check_browser_vendor_and_renderer_consistency(self):
-        gpu_vendor = self.fingerprint_gpu_vendor
-        gpu_renderer = self.fingerprint_gpu_renderer
-        if (gpu_vendor is None) != (gpu_renderer is None):
+        if (self.fingerprint_gpu_vendor is None) != (self.fingerprint_gpu_renderer is None):
             raise ValueError(
                 "fingerprint_gpu_vendor and fingerprint_gpu_renderer must be both set or both unset."
             )
         return self
 
+    def to_chromium_args(self) -> list[str]:
+        """
+        将指纹参数转换为浏览器启动参数
+        """
+        exclude = set()
+        if not sys.platform.startswith(
+                'linux'):  # WebGL 元数据：修改 GPU 供应商和显卡型号（暂时只支持 Linux）。 https://github.com/adryfish/fingerprint-chromium/blob/main/README-ZH.md
+            exclude = {'fingerprint_gpu_vendor', 'fingerprint_gpu_renderer'}
+        params = self.model_dump(
+            include=BaseFingerprintBrowserInitParams.model_fields.keys() - exclude,
+            exclude_none=True,
+            by_alias=True
+        )
+        # 过滤掉可能导致问题的参数
+        return [f'--{k}={v}'.replace('_', '-') for k, v in params.items() if v]
+
 
 class UserBrowserInfoBase(BaseFingerprintBrowserInitParams):
-    browser_token: uuid.UUID = Field(default_factory=uuid.uuid4, unique=True, index=True)
-    created_at: datetime = Field(default_factory=datetime.now, nullable=False)
-    updated_at: datetime = Field(default_factory=datetime.now, nullable=False)
+    browser_token: uuid.UUID = Field(
+        default_factory=uuid.uuid4,
+        sa_column=Column(name='browser_token', type_=BinaryUUID, unique=True, index=True, nullable=False)
+    )
+    # 时间戳由数据库生成，与 init.sql 中的 DEFAULT CURRENT_TIMESTAMP 保持一致
+    created_at: datetime | None = Field(
+        default=None,
+        nullable=False,
+        sa_column_kwargs={'server_default': func.now()}
+    )
+    updated_at: datetime | None = Field(
+        default=None,
+        nullable=False,
+        sa_column_kwargs={'server_default': func.now(), 'onupdate': func.now()}
+    )
 
 
 class UserBrowserInfo(UserBrowserInfoBase, table=True):
@@ -103,7 +169,12 @@ class UserBrowserInfoCreateParams(SQLModel):
 
 
 class UserBrowserInfoCreateResp(UserBrowserInfoBase):
-    ...
+    # 直接从 ORM 对象的属性校验，省去 model_dump 的中间字典
+    model_config = ConfigDict(from_attributes=True, populate_by_name=True)
+
+
+class UserBrowserInfoBulkCreateParams(SQLModel):
+    items: list[UserBrowserInfoCreateParams] = Field(..., min_length=1, max_length=100)
 
 
 class UserBrowserInfoReadParams(SQLModel):
@@ -111,7 +182,12 @@ class UserBrowserInfoReadParams(SQLModel):
 
 
 class UserBrowserInfoReadResp(UserBrowserInfoBase):
-    ...
+    model_config = ConfigDict(from_attributes=True, populate_by_name=True)
+
+    @cached_property
+    def chromium_args(self) -> tuple[str, ...]:
+        # 随指纹缓存一起复用，启动浏览器时无需重新生成
+        return tuple(self.to_chromium_args())
 
 
 class UserBrowserInfoUpdateParams(SQLModel):
@@ -148,6 +224,8 @@ class BrowserOpenUrlParams(SQLModel):
     browser_token: uuid.UUID
     url: str
     headless: bool = True
+    # 大多数 RPA 场景只需要文档本身，无需等待图片等子资源加载完成
+    wait_until: PageWaitUntilEnum = PageWaitUntilEnum.domcontentloaded
 
 
 class BrowserOpenUrlResp(SQLModel):
@@ -183,3 +261,9 @@ class LiveCreateParams(SQLModel):
 class LiveCreateResp(SQLModel):
     live_id: str
     live_url: str
+
+
+class LiveWsActionParams(SQLModel):
+    action: str
+    args: list = Field(default_factory=list)
+    kwargs: dict = Field(default_factory=dict)
@@ -1,6 +1,8 @@
 from typing import Optional, TypeVar, Generic, Any
 from sqlmodel import SQLModel
 from pydantic import BaseModel
+from pydantic_core import to_json
+from starlette.responses import JSONResponse
 
 from app.models.response_code import ResponseCode
 
@@ -27,12 +29,38 @@ class StandardResponse(SQLModel, Generic[DataT]):
 SuccessResponse = StandardResponse[DataT]
 
 
+class PydanticJSONResponse(JSONResponse):
+    """
+    使用 pydantic-core（Rust 实现）序列化的 JSON 响应，比标准库 json 更快
+    """
+
+    def render(self, content: Any) -> bytes:
+        # 与 FastAPI 默认的 response_model_by_alias=True 保持一致
+        return to_json(content, by_alias=True)
+
+
 # 工具函数用于创建标准响应
 def success_response(data: Optional[DataT] = None, msg: str = "success") -> StandardResponse[DataT]:
     """创建成功响应"""
     return StandardResponse(code=ResponseCode.SUCCESS, data=data, msg=msg)
 
 
+def success_json_response(data: Optional[Any] = None, msg: str = "success") -> PydanticJSONResponse:
+    """
+    创建已序列化的成功响应。
+    直接返回 Response 对象时 FastAPI 不再对其做 response_model 校验，数据只序列化一次
+    """
+    return PydanticJSONResponse(content=success_response(data=data, msg=msg))
+
+
 def error_response(code: int, msg: str = "error", data: Optional[Any] = None) -> StandardResponse[Any]:
     """创建错误响应"""
-    return StandardResponse(code=code, data=data, msg=msg)
\ No newline at end of file
+    return StandardResponse(code=code, data=data, msg=msg)
+
+
+def prebuilt_error_response(code: int, msg: str = "error") -> PydanticJSONResponse:
+    """
+    预先构建并序列化的错误响应，适用于固定内容的错误（如 NOT_FOUND），可在多次请求间复用。
+    直接返回 Response 对象时 FastAPI 不再对其做 response_model 校验
+    """
+    return PydanticJSONResponse(content=error_response(code=code, msg=msg).model_dump())
@@ -9,6 +9,7 @@ class RouterPrefix(StrEnum):
 class BrowserRouterPath(StrEnum):
     gen_rand_fingerprint = "/gen_rand_fingerprint"
     create_fingerprint = '/create_fingerprint'
+    create_fingerprint_bulk = '/create_fingerprint_bulk'
     read_fingerprint = '/read_fingerprint'
     update_fingerprint = '/update_fingerprint'
     delete_fingerprint = '/delete_fingerprint'
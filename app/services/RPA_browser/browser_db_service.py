@@ -1,8 +1,13 @@
-from sqlmodel import select
+import time
+import uuid
+import asyncio
+from collections import OrderedDict
+from sqlmodel import select, update, delete, func
 from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models.RPA_browser.models import (
     UserBrowserInfo,
     UserBrowserInfoCreateParams,
+    UserBrowserInfoBulkCreateParams,
     BaseFingerprintBrowserInitParams,
     UserBrowserInfoReadParams,
     UserBrowserInfoUpdateParams,
@@ -14,10 +19,44 @@ from app.models.RPA_browser.models import (
 )
 from app.services.broswer_fingerprint.fingerprint_gen import gen_from_browserforge_fingerprint
 from app.models.response_code import ResponseCode
-from typing import Union
+from typing import Union, Tuple
+
+# 指纹缓存配置：指纹在创建后基本不变，短时间缓存可省去重复的数据库查询
+FINGERPRINT_CACHE_TTL = 300
+FINGERPRINT_CACHE_MAXSIZE = 4096
 
 
 class BrowserDBService:
+    # browser_token -> (过期时间, 指纹信息)，按最近使用顺序排列
+    _fingerprint_cache: OrderedDict[uuid.UUID, Tuple[float, UserBrowserInfoReadResp]] = OrderedDict()
+
+    @classmethod
+    def _get_cached_fingerprint(cls, browser_token: uuid.UUID) -> Union[UserBrowserInfoReadResp, None]:
+        cached = cls._fingerprint_cache.get(browser_token)
+        if cached is None:
+            return None
+        expire_at, browser_info = cached
+        if expire_at < time.monotonic():
+            cls._fingerprint_cache.pop(browser_token, None)
+            return None
+        cls._fingerprint_cache.move_to_end(browser_token)
+        return browser_info
+
+    @classmethod
+    def _set_cached_fingerprint(cls, browser_token: uuid.UUID, browser_info: UserBrowserInfoReadResp):
+        cls._fingerprint_cache[browser_token] = (time.monotonic() + FINGERPRINT_CACHE_TTL, browser_info)
+        cls._fingerprint_cache.move_to_end(browser_token)
+        if len(cls._fingerprint_cache) > FINGERPRINT_CACHE_MAXSIZE:
+            # 缓存已满，淘汰最久未使用的条目
+            cls._fingerprint_cache.popitem(last=False)
+
+    @classmethod
+    def invalidate_fingerprint_cache(cls, browser_token: uuid.UUID):
+        """
+        使指定browser_token的指纹缓存失效
+        """
+        cls._fingerprint_cache.pop(browser_token, None)
+
     @staticmethod
     async def create_fingerprint(
             params: UserBrowserInfoCreateParams,
@@ -26,61 +65,89 @@ class BrowserDBService:
         """
         创建浏览器指纹信息
         """
-        fingerprint_data: BaseFingerprintBrowserInitParams = gen_from_browserforge_fingerprint(params=params)
+        # 指纹生成是纯 Python 的 CPU 计算，放到线程中执行避免阻塞事件循环
+        fingerprint_data: BaseFingerprintBrowserInitParams = await asyncio.to_thread(
+            gen_from_browserforge_fingerprint, params=params
+        )
         browser_info = UserBrowserInfo(**fingerprint_data.model_dump())
         session.add(browser_info)
         await session.commit()
         await session.refresh(browser_info)
-        return UserBrowserInfoCreateResp(**browser_info.model_dump())
+        return UserBrowserInfoCreateResp.model_validate(browser_info)
 
     @staticmethod
+    async def create_fingerprints_bulk(
+            params: UserBrowserInfoBulkCreateParams,
+            session: AsyncSession
+    ) -> list[UserBrowserInfoCreateResp]:
+        """
+        批量创建浏览器指纹信息，所有记录在同一个事务中提交
+        """
+        fingerprint_data_list: list[BaseFingerprintBrowserInitParams] = await asyncio.to_thread(
+            lambda: [gen_from_browserforge_fingerprint(params=item) for item in params.items]
+        )
+        browser_infos = [UserBrowserInfo(**fingerprint_data.model_dump()) for fingerprint_data in fingerprint_data_list]
+        session.add_all(browser_infos)
+        await session.commit()
+        # 一次查询取回数据库生成的字段（id、时间戳），代替逐条 refresh
+        browser_tokens = [browser_info.browser_token for browser_info in browser_infos]
+        stmt = select(UserBrowserInfo).where(UserBrowserInfo.browser_token.in_(browser_tokens))
+        result = await session.exec(stmt)
+        created = {browser_info.browser_token: browser_info for browser_info in result.all()}
+        return [UserBrowserInfoCreateResp.model_validate(created[browser_token]) for browser_token in browser_tokens]
+
+    @classmethod
     async def read_fingerprint(
+            cls,
             params: UserBrowserInfoReadParams,
             session: AsyncSession
     ) -> Union[UserBrowserInfoReadResp, None]:
         """
         读取浏览器指纹信息
         """
+        cached = cls._get_cached_fingerprint(params.browser_token)
+        if cached is not None:
+            return cached
         stmt = select(UserBrowserInfo).where(UserBrowserInfo.browser_token == params.browser_token)
         result = await session.exec(stmt)
         browser_info = result.one_or_none()
         if browser_info is None:
             return None
-        return UserBrowserInfoReadResp(**browser_info.model_dump())
+        resp = UserBrowserInfoReadResp.model_validate(browser_info)
+        cls._set_cached_fingerprint(params.browser_token, resp)
+        return resp
 
-    @staticmethod
+    @classmethod
     async def update_fingerprint(
+            cls,
             params: UserBrowserInfoUpdateParams,
             session: AsyncSession
     ) -> bool:
-        stmt = select(UserBrowserInfo).where(UserBrowserInfo.browser_token == params.browser_token)
-        result = await session.exec(stmt)
-        browser_info = result.one_or_none()
-
-        if browser_info is None:
-            return False
-
-        update_data = params.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(browser_info, key, value)
-
-        session.add(browser_info)
+        update_data = params.model_dump(exclude_unset=True, exclude={'browser_token'})
+        if not update_data:
+            # 没有需要更新的字段时只刷新更新时间，同样可以用影响行数判断记录是否存在
+            update_data = {'updated_at': func.now()}
+        # 单条 UPDATE 语句完成查找和更新，通过影响行数判断记录是否存在
+        stmt = update(UserBrowserInfo).where(
+            UserBrowserInfo.browser_token == params.browser_token
+        ).values(**update_data)
+        result = await session.execute(stmt)
         await session.commit()
-        await session.refresh(browser_info)
+        if result.rowcount == 0:
+            return False
+        cls.invalidate_fingerprint_cache(params.browser_token)
         return True
 
-    @staticmethod
+    @classmethod
     async def delete_fingerprint(
+            cls,
             params: UserBrowserInfoDeleteParams,
             session: AsyncSession
     ) -> bool:
-        stmt = select(UserBrowserInfo).where(UserBrowserInfo.browser_token == params.browser_token)
-        result = await session.exec(stmt)
-        browser_info = result.one_or_none()
-
-        if browser_info is None:
-            return False
-
-        await session.delete(browser_info)
+        stmt = delete(UserBrowserInfo).where(UserBrowserInfo.browser_token == params.browser_token)
+        result = await session.execute(stmt)
         await session.commit()
+        if result.rowcount == 0:
+            return False
+        cls.invalidate_fingerprint_cache(params.browser_token)
         return True
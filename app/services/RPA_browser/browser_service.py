@@ -14,31 +14,32 @@ class BrowserService:
     @staticmethod
     async def open_url(params: BrowserOpenUrlParams) -> BrowserOpenUrlResp:
         pool = get_default_session_pool()
-        page = await pool.get_page(params.browser_token, headless=params.headless)
+        page = await pool.acquire_page(params.browser_token, headless=params.headless)
         try:
-            await page.goto(params.url, wait_until="load")
+            await page.goto(params.url, wait_until=params.wait_until.value)
             title = await page.title()
             current_url = page.url
             return BrowserOpenUrlResp(title=title, current_url=current_url)
         finally:
-            try:
-                await page.close()
-            except Exception:
-                pass
+            await pool.release_page(params.browser_token, page)
 
     @staticmethod
-    async def screenshot(params: BrowserScreenshotParams) -> BrowserScreenshotResp:
+    async def screenshot_bytes(params: BrowserScreenshotParams) -> bytes:
+        """
+        截图并返回原始图片字节
+        """
         pool = get_default_session_pool()
-        page = await pool.get_page(params.browser_token, headless=params.headless)
+        page = await pool.acquire_page(params.browser_token, headless=params.headless)
         try:
-            image_bytes = await page.screenshot(full_page=params.full_page, type=(params.type or 'png'))
-            image_base64 = base64.b64encode(image_bytes).decode('ascii')
-            return BrowserScreenshotResp(image_base64=image_base64)
+            return await page.screenshot(full_page=params.full_page, type=(params.type or 'png'))
         finally:
-            try:
-                await page.close()
-            except Exception:
-                pass
+            await pool.release_page(params.browser_token, page)
+
+    @staticmethod
+    async def screenshot(params: BrowserScreenshotParams) -> BrowserScreenshotResp:
+        image_bytes = await BrowserService.screenshot_bytes(params)
+        image_base64 = base64.b64encode(image_bytes).decode('ascii')
+        return BrowserScreenshotResp(image_base64=image_base64)
 
     @staticmethod
     async def release(params: BrowserReleaseParams) -> BrowserReleaseResp:
@@ -1,60 +1,137 @@
 import time
 import uuid
-import json
+import base64
 import asyncio
 from typing import Optional
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Dict
+
+from pydantic import ValidationError
+from pydantic_core import from_json, to_json
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.config import settings
-from app.models.RPA_browser.models import get_session, UserBrowserInfoReadParams
+from app.models.RPA_browser.models import _get_engine, UserBrowserInfoReadParams, LiveWsActionParams
 from app.services.RPA_browser.browser_db_service import BrowserDBService
 from app.services.RPA_browser.playwright_pool import get_default_session_pool
 from app.models.router.router_prefix import BrowserControlRouterPath, RouterPrefix
 
+# 允许通过 WebSocket action 消息调用的 Page 方法
+ALLOWED_PAGE_ACTIONS = frozenset({
+    'click', 'dblclick', 'fill', 'type', 'press', 'check', 'uncheck', 'select_option',
+    'hover', 'focus', 'goto', 'reload', 'go_back', 'go_forward',
+    'wait_for_selector', 'wait_for_load_state', 'wait_for_timeout', 'title', 'content',
+})
+
+# live 会话上限及空闲过期时间（秒），超出上限时淘汰最久未访问的会话
+LIVE_SESSION_MAXSIZE = 1024
+LIVE_SESSION_TTL = 60 * 60
+# 后台清理过期 live 会话的间隔（秒）
+LIVE_SESSION_SWEEP_INTERVAL = 60
+
+# MJPEG 每帧固定的 multipart 头部前缀
+_FRAME_HEADER_PREFIX = b"--frame\r\nContent-Type: image/jpeg\r\nContent-Length: "
+
 
 @dataclass
 class LiveSessionEntry:
     browser_token: str
+    browser_token_uuid: uuid.UUID  # 创建时即保存 UUID 对象，避免每次使用时重新解析
     headless: bool
     page: Optional[object] = None
     ts: int = 0
 
 
 class LiveService:
-    # 维护 live 会话状态
-    live_sessions: Dict[str, LiveSessionEntry] = {}
+    # 维护 live 会话状态，按最近访问顺序排列（最久未访问的在最前）
+    live_sessions: OrderedDict[str, LiveSessionEntry] = OrderedDict()
+    # 保护 live_sessions 的增删
+    _live_sessions_lock = asyncio.Lock()
+    # 定期清理过期会话的后台任务，存在 live 会话时才运行
+    _sweep_task: Optional[asyncio.Task] = None
 
     @staticmethod
     async def validate_browser_token(browser_token: uuid.UUID) -> bool:
-        session_generator = get_session()
-        session = await session_generator.__anext__()
-        record = await BrowserDBService.read_fingerprint(
-            params=UserBrowserInfoReadParams(browser_token=browser_token),
-            session=session
-        )
-        await session_generator.aclose()
+        # read_fingerprint 自带按 browser_token 的缓存，命中时不会访问数据库
+        async with AsyncSession(_get_engine()) as session:
+            record = await BrowserDBService.read_fingerprint(
+                params=UserBrowserInfoReadParams(browser_token=browser_token),
+                session=session
+            )
         return record is not None
 
     @classmethod
     async def create_live_session(cls, browser_token: uuid.UUID, headless: bool = True) -> str:
         # 使用 browser_token 作为 live_id
         live_id = str(browser_token)
-        cls.live_sessions[live_id] = LiveSessionEntry(
-            browser_token=str(browser_token),
-            headless=bool(headless),
-            ts=int(time.time())
-        )
+        async with cls._live_sessions_lock:
+            expired = cls._sweep_live_sessions()
+            cls.live_sessions[live_id] = LiveSessionEntry(
+                browser_token=str(browser_token),
+                browser_token_uuid=browser_token,
+                headless=bool(headless),
+                ts=int(time.time())
+            )
+            cls.live_sessions.move_to_end(live_id)
+            while len(cls.live_sessions) > LIVE_SESSION_MAXSIZE:
+                _, evicted = cls.live_sessions.popitem(last=False)
+                expired.append(evicted)
+        await cls._release_expired(expired)
+        cls._start_sweep_task()
         # 通知会话池开始远程控制
-        pool = get_default_session_pool()
-        await pool.start_remote_control(browser_token)
+        await get_default_session_pool().start_remote_control(browser_token)
         return live_id
 
+    @staticmethod
+    async def _release_expired(expired: list[LiveSessionEntry]):
+        """被清理的会话需恢复自动化操作"""
+        if not expired:
+            return
+        pool = get_default_session_pool()
+        for entry in expired:
+            entry.page = None
+            await pool.stop_remote_control(entry.browser_token_uuid)
+
+    @classmethod
+    def _start_sweep_task(cls):
+        """启动过期会话清理任务，服务空闲时过期会话也能被及时释放"""
+        if cls._sweep_task is None or cls._sweep_task.done():
+            cls._sweep_task = asyncio.create_task(cls._sweep_loop())
+
+    @classmethod
+    async def _sweep_loop(cls):
+        """定期清理过期会话，会话全部移除后退出，下次创建会话时重新启动"""
+        while cls.live_sessions:
+            await asyncio.sleep(LIVE_SESSION_SWEEP_INTERVAL)
+            try:
+                async with cls._live_sessions_lock:
+                    expired = cls._sweep_live_sessions()
+                await cls._release_expired(expired)
+            except Exception:
+                pass  # 忽略清理过程中的异常
+
+    @classmethod
+    def _sweep_live_sessions(cls) -> list[LiveSessionEntry]:
+        """
+        移除超过 LIVE_SESSION_TTL 未访问的会话并返回，调用方需持有 _live_sessions_lock
+        """
+        expire_before = int(time.time()) - LIVE_SESSION_TTL
+        expired = []
+        # 有序字典按访问时间排列，遇到未过期的条目即可停止
+        while cls.live_sessions:
+            live_id, entry = next(iter(cls.live_sessions.items()))
+            if entry.ts >= expire_before:
+                break
+            del cls.live_sessions[live_id]
+            expired.append(entry)
+        return expired
+
     @classmethod
     async def stop_live_session(cls, browser_token: uuid.UUID) -> bool:
         # 使用 browser_token 作为键来查找和删除会话
         live_id = str(browser_token)
-        existed = cls.live_sessions.pop(live_id, None)
+        async with cls._live_sessions_lock:
+            existed = cls.live_sessions.pop(live_id, None)
         if existed is not None:
             # 不再强制关闭页面，因为页面可能还有其他任务在执行
             # 只需要从会话中移除页面引用即可
@@ -69,7 +146,24 @@ class LiveService:
     @classmethod
     def get_live_entry(cls, live_id: str) -> Optional[LiveSessionEntry]:
         # 使用 browser_token 作为键来获取会话
-        return cls.live_sessions.get(live_id)
+        entry = cls.live_sessions.get(live_id)
+        if entry is not None and entry.ts < int(time.time()) - LIVE_SESSION_TTL:
+            # 已过期但还未被后台任务清理，视为不存在
+            return None
+        if entry is not None:
+            cls.touch_live_entry(entry)
+        return entry
+
+    @classmethod
+    def touch_live_entry(cls, entry: LiveSessionEntry):
+        """刷新会话的访问时间，WebSocket 消息和视频帧持续到达时会话不会被当作过期清理"""
+        now = int(time.time())
+        if entry.ts == now:
+            return
+        entry.ts = now
+        # 同步方法内不会切换协程，无需加锁；会话已被移除时不再放回
+        if entry.browser_token in cls.live_sessions:
+            cls.live_sessions.move_to_end(entry.browser_token)
 
     @staticmethod
     async def get_page_for_entry(entry: LiveSessionEntry):
@@ -88,7 +182,7 @@ class LiveService:
         except Exception:
             pass
         headless = entry.headless
-        browser_token = uuid.UUID(entry.browser_token)
+        browser_token = entry.browser_token_uuid
         pool = get_default_session_pool()
         page = await pool.get_page(browser_token, headless=headless)
         entry.page = page
@@ -98,64 +192,115 @@ class LiveService:
     async def generate_video_stream(entry):
         """生成视频流数据"""
         page = await LiveService.get_page_for_entry(entry)
-        
+
         async def frame_generator():
+            # 使用 CDP 的 Page.startScreencast 由浏览器主动推送 JPEG 帧，代替轮询 page.screenshot()
+            frame_queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=2)
+            cdp = None
             try:
+                cdp = await page.context.new_cdp_session(page)
+
+                async def on_screencast_frame(params: dict):
+                    # 必须确认收到帧，否则浏览器会停止推送
+                    try:
+                        await cdp.send('Page.screencastFrameAck', {'sessionId': params['sessionId']})
+                    except Exception:
+                        pass
+                    if frame_queue.full():
+                        # 客户端消费不及时，丢弃旧帧只保留最新画面
+                        frame_queue.get_nowait()
+                    frame_queue.put_nowait(base64.b64decode(params['data']))
+
+                cdp.on('Page.screencastFrame', on_screencast_frame)
+                await cdp.send('Page.startScreencast', {'format': 'jpeg', 'quality': 60, 'everyNthFrame': 2})
                 while True:
-                    img_bytes = await page.screenshot(full_page=False, type='jpeg', quality=60)
-                    yield b"--frame\r\n" \
-                        + b"Content-Type: image/jpeg\r\n" \
-                        + f"Content-Length: {len(img_bytes)}\r\n\r\n".encode('ascii') \
-                        + img_bytes + b"\r\n"
-                    await asyncio.sleep(0.2)
+                    img_bytes = await frame_queue.get()
+                    LiveService.touch_live_entry(entry)
+                    yield b"".join((
+                        _FRAME_HEADER_PREFIX, str(len(img_bytes)).encode('ascii'), b"\r\n\r\n", img_bytes, b"\r\n"
+                    ))
             except Exception:
                 pass
+            finally:
+                if cdp is not None:
+                    try:
+                        await cdp.send('Page.stopScreencast')
+                        await cdp.detach()
+                    except Exception:
+                        pass
 
         return frame_generator
 
     @staticmethod
-    async def handle_websocket_message(websocket, page, message: str):
-        """处理WebSocket消息"""
+    async def _send_json(websocket, data: dict):
+        """序列化并发送消息，to_json 直接输出 UTF-8 字节，仍以文本帧发送以兼容现有前端"""
+        await websocket.send_text(to_json(data).decode())
+
+    @staticmethod
+    def _to_payload(result):
+        """结果尽量可序列化"""
+        return result if isinstance(result, (str, int, float, bool, type(None))) else str(result)
+
+    @staticmethod
+    async def _handle_eval(websocket, page, data: dict):
+        """在页面中执行 JavaScript"""
+        code = data.get('code', '')
         try:
-            data = json.loads(message)
-        except Exception:
-            await websocket.send_text(json.dumps({'type': 'error', 'payload': 'invalid json'}))
+            result = await page.evaluate(code)
+            await LiveService._send_json(websocket, {'type': 'eval_result', 'payload': LiveService._to_payload(result)})
+        except Exception as e:
+            await LiveService._send_json(websocket, {'type': 'error', 'payload': str(e)})
+
+    @staticmethod
+    async def _handle_action(websocket, page, data: dict):
+        """调用白名单内的 Page 方法"""
+        try:
+            params = LiveWsActionParams.model_validate(data)
+        except ValidationError as e:
+            await LiveService._send_json(websocket, {'type': 'error', 'payload': str(e)})
             return
+        if params.action not in ALLOWED_PAGE_ACTIONS:
+            await LiveService._send_json(websocket, {'type': 'error', 'payload': f'action not allowed: {params.action}'})
+            return
+        try:
+            result = await getattr(page, params.action)(*params.args, **params.kwargs)
+            await LiveService._send_json(websocket, {'type': 'action_result', 'payload': LiveService._to_payload(result)})
+        except Exception as e:
+            await LiveService._send_json(websocket, {'type': 'error', 'payload': str(e)})
 
-        msg_type = data.get('type')
-        if msg_type == 'eval':
-            code = data.get('code', '')
+    @staticmethod
+    async def _handle_navigate(websocket, page, data: dict):
+        """导航到指定URL"""
+        url = data.get('url', '')
+        if url:
             try:
-                # 如果代码中包含 await page，则使用 page.evaluate 并支持 Playwright API
-                if code.strip().startswith('await page'):
-                    # 执行 Playwright 命令
-                    # 创建一个局部变量上下文，将 page 对象注入其中
-                    context = {'page': page}
-                    exec_result = eval(code, context)
-                    if hasattr(exec_result, '__await__'):
-                        result = await exec_result
-                    else:
-                        result = exec_result
-                else:
-                    # 传统的 evaluate 执行方式
-                    result = await page.evaluate(code)
-
-                # 结果尽量可序列化
-                await websocket.send_text(json.dumps({
-                    'type': 'eval_result',
-                    'payload': result if isinstance(result, (str, int, float, bool, type(None))) else str(result)
-                }))
+                await page.goto(url)
+                await LiveService._send_json(websocket, {'type': 'info', 'payload': f'已导航到: {url}'})
             except Exception as e:
-                await websocket.send_text(json.dumps({'type': 'error', 'payload': str(e)}))
-        elif msg_type == 'navigate':
-            url = data.get('url', '')
-            if url:
-                try:
-                    await page.goto(url)
-                    await websocket.send_text(json.dumps({'type': 'info', 'payload': f'已导航到: {url}'}))
-                except Exception as e:
-                    await websocket.send_text(json.dumps({'type': 'error', 'payload': str(e)}))
-            else:
-                await websocket.send_text(json.dumps({'type': 'error', 'payload': 'URL 不能为空'}))
+                await LiveService._send_json(websocket, {'type': 'error', 'payload': str(e)})
         else:
-            await websocket.send_text(json.dumps({'type': 'error', 'payload': 'unknown message type'}))
\ No newline at end of file
+            await LiveService._send_json(websocket, {'type': 'error', 'payload': 'URL 不能为空'})
+
+    # 消息类型 -> 处理函数
+    _message_handlers = {
+        'eval': _handle_eval,
+        'action': _handle_action,
+        'navigate': _handle_navigate,
+    }
+
+    @staticmethod
+    async def handle_websocket_message(websocket, page, message: str | bytes):
+        """处理WebSocket消息"""
+        try:
+            data = from_json(message)
+        except Exception:
+            data = None
+        if not isinstance(data, dict):
+            await LiveService._send_json(websocket, {'type': 'error', 'payload': 'invalid json'})
+            return
+
+        handler = LiveService._message_handlers.get(data.get('type'))
+        if handler is None:
+            await LiveService._send_json(websocket, {'type': 'error', 'payload': 'unknown message type'})
+            return
+        await handler(websocket, page, data)
@@ -1,14 +1,24 @@
 import asyncio
+import heapq
 import uuid
 import time
-from typing import Dict, Optional, Tuple
-from collections import defaultdict
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+from collections import OrderedDict
 from datetime import datetime
 
+from app.config import settings
 from app.models.RPA_browser.dataclass_model import SessionInfo
 from app.services.RPA_browser.base.base_engines import BaseUndetectedPlaywright
-from patchright.async_api import BrowserContext
 
+if TYPE_CHECKING:
+    from patchright.async_api import BrowserContext, Page
+
+# 精简模式下通过 CDP 屏蔽的资源，不使用 page.route 以避免其在每个请求上的开销和内存泄漏
+_LITE_MODE_BLOCKED_URLS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf',
+    '*.mp4', '*.webm', '*.mp3', '*.m3u8', '*.flv',
+]
 
 class PlaywrightSessionPool:
     """
@@ -21,12 +31,29 @@ class PlaywrightSessionPool:
     4. 并发安全访问
     """
 
-    def __init__(self):
-        # 存储活跃会话的字典，键为browser_token，值为SessionInfo
-        self._active_sessions: Dict[uuid.UUID, SessionInfo] = {}
+    def __init__(self, max_sessions: int = 10, max_idle_pages: int = 4, page_recycle_uses: int = 50,
+                 max_pages_per_context: int = 100):
+        # 存储活跃会话的有序字典，键为browser_token，值为SessionInfo，按最近使用顺序排列（最久未使用的在最前）
+        self._active_sessions: OrderedDict[uuid.UUID, SessionInfo] = OrderedDict()
+        # 会话数量上限，超出时淘汰最久未使用的会话
+        self._max_sessions = max_sessions
+        # (last_used, browser_token) 最小堆，清理时只检查可能过期的会话；
+        # 每个会话只有一个有效条目（时间戳等于 SessionInfo.heap_ts），出堆时若 last_used 已更新则按新时间重新入堆；
+        # 会话被移除或重建后遗留的条目在出堆时丢弃，堆过大时整体重建
+        self._lru_heap: List[Tuple[float, uuid.UUID]] = []
+        self._session_idle_timeout = 30 * 60
+
+        # 通过 acquire_page 借出的页面 -> 借出时所属的会话，归还时只修改该会话的计数，会话重建后不会错记到新会话上
+        self._page_owners: Dict["Page", SessionInfo] = {}
 
-        # 存储正在使用的会话锁，确保对同一会话的并发访问安全
-        self._session_locks: Dict[uuid.UUID, asyncio.Lock] = defaultdict(asyncio.Lock)
+        # 每个会话的空闲页面队列，页面用完后放回复用，避免每次请求都 new_page()/close()
+        self._page_pools: Dict[uuid.UUID, asyncio.Queue] = {}
+        # 页面已被借出的次数，达到 page_recycle_uses 后关闭重建，避免单个页面内存持续增长
+        self._page_use_counts: Dict["Page", int] = {}
+        self._max_idle_pages = max_idle_pages
+        self._page_recycle_uses = page_recycle_uses
+        # 长期存活的上下文会不断累积 Request/Response 对象，提供的页面数达到上限后重建上下文
+        self._max_pages_per_context = max_pages_per_context
 
         # 全局锁，用于保护会话池操作
         self._pool_lock = asyncio.Lock()
@@ -51,30 +78,62 @@ class PlaywrightSessionPool:
 
     async def _cleanup_inactive_sessions(self):
         """清理不活动的会话"""
-        current_time = time.time()
+        expire_before = time.time() - self._session_idle_timeout
         inactive_tokens = []
+        # 远程控制中的会话暂不清理，循环结束后再放回堆中
+        deferred = []
 
-        # 查找不活动的会话
+        # 查找并移除不活动的会话，锁内只做字典操作
         async with self._pool_lock:
-            for browser_token, session_info in self._active_sessions.items():
-                # 检查会话是否超过30分钟未活动且不在远程控制状态
-                if (current_time - session_info.last_used > 30 * 60 and
-                        not session_info.playwright_instance.is_remote_control_active):
-                    inactive_tokens.append(browser_token)
-
-            # 清理不活动的会话
-            for browser_token in inactive_tokens:
-                await self._close_session(browser_token)
-
-    async def _close_session(self, browser_token: uuid.UUID):
-        """关闭指定的会话"""
-        if browser_token in self._active_sessions:
-            session_info = self._active_sessions[browser_token]
-            await anext(session_info.browser_generator)
-            del self._active_sessions[browser_token]
+            while self._lru_heap and self._lru_heap[0][0] < expire_before:
+                ts, browser_token = heapq.heappop(self._lru_heap)
+                session_info = self._active_sessions.get(browser_token)
+                if session_info is None or ts != session_info.heap_ts:
+                    # 会话已被释放，或是同一 token 重建前遗留的条目，直接丢弃
+                    continue
+                if session_info.last_used >= expire_before:
+                    # 期间被使用过，按最新使用时间重新入堆
+                    self._push_lru(session_info, browser_token)
+                    continue
+                if session_info.playwright_instance.is_remote_control_active:
+                    deferred.append((session_info, browser_token))
+                    continue
+                inactive_tokens.append(browser_token)
+            for session_info, browser_token in deferred:
+                self._push_lru(session_info, browser_token)
+            removed_sessions = [self._pop_session(browser_token) for browser_token in inactive_tokens]
+
+        # 在锁外关闭浏览器，避免阻塞其他请求
+        await self._shutdown_sessions(removed_sessions)
+
+    def _push_lru(self, session_info: SessionInfo, browser_token: uuid.UUID):
+        """按会话当前的 last_used 放入 LRU 堆，遗留条目超过活跃会话数两倍时重建堆，调用方需持有 _pool_lock"""
+        session_info.heap_ts = session_info.last_used
+        heapq.heappush(self._lru_heap, (session_info.heap_ts, browser_token))
+        if len(self._lru_heap) > 2 * len(self._active_sessions) + 8:
+            self._lru_heap = [(info.heap_ts, token) for token, info in self._active_sessions.items()]
+            heapq.heapify(self._lru_heap)
+
+    def _pop_session(self, browser_token: uuid.UUID) -> Optional[SessionInfo]:
+        """从会话池中移除指定会话并返回，调用方需持有 _pool_lock，浏览器需再调用 _shutdown_sessions 关闭"""
+        self._drop_page_pool(browser_token)
+        return self._active_sessions.pop(browser_token, None)
+
+    @staticmethod
+    async def _shutdown_sessions(session_infos: List[Optional[SessionInfo]]):
+        """并发关闭已从会话池移除的会话，不需要持有 _pool_lock"""
+
+        async def shutdown(session_info: SessionInfo):
+            # 驱动 launch_browser_span 生成器执行完 yield 之后的关闭逻辑
+            await anext(session_info.browser_generator, None)
+
+        await asyncio.gather(
+            *(shutdown(session_info) for session_info in session_infos if session_info is not None),
+            return_exceptions=True
+        )
 
     async def get_session(self, browser_token: uuid.UUID, headless: bool = True) -> Tuple[
-        BaseUndetectedPlaywright, BrowserContext]:
+        BaseUndetectedPlaywright, "BrowserContext"]:
         """
         获取指定browser_token的浏览器会话，如果不存在则创建新的
         
@@ -88,16 +147,14 @@ class PlaywrightSessionPool:
         # 先尝试获取现有的会话
         async with self._pool_lock:
             if browser_token in self._active_sessions:
-                session_info = self._active_sessions[browser_token]
-                session_info.last_used = time.time()
-                session_info.playwright_instance.update_activity_timestamp()
+                session_info = self._touch_session(browser_token)
                 return (session_info.playwright_instance, session_info.browser_context)
 
         # 创建新的会话
         return await self._create_session(browser_token, headless)
 
     async def _create_session(self, browser_token: uuid.UUID, headless: bool = True) -> Tuple[
-        BaseUndetectedPlaywright, BrowserContext]:
+        BaseUndetectedPlaywright, "BrowserContext"]:
         """
         创建新的浏览器会话
         
@@ -111,9 +168,7 @@ class PlaywrightSessionPool:
         async with self._pool_lock:
             # 双重检查，防止并发情况下重复创建
             if browser_token in self._active_sessions:
-                session_info = self._active_sessions[browser_token]
-                session_info.last_used = time.time()
-                session_info.playwright_instance.update_activity_timestamp()
+                session_info = self._touch_session(browser_token)
                 return (session_info.playwright_instance, session_info.browser_context)
 
             # 创建新的BaseUndetectedPlaywright实例
@@ -132,7 +187,69 @@ class PlaywrightSessionPool:
                 last_used=time.time()
             )
             self._active_sessions[browser_token] = session_info
-            return (playwright_instance, browser_context)
+            self._push_lru(session_info, browser_token)
+            evicted_sessions = self._evict_overflow_sessions(browser_token)
+
+        await self._shutdown_sessions(evicted_sessions)
+        await self._prewarm_page_pool(browser_token, browser_context)
+        return (playwright_instance, browser_context)
+
+    async def _prewarm_page_pool(self, browser_token: uuid.UUID, browser_context: "BrowserContext"):
+        """
+        新会话预先放入一个空白页面，第一次 acquire_page 时无需等待标签页启动
+        """
+        try:
+            # 持久化上下文启动时自带一个页面，直接复用
+            if browser_context.pages:
+                page = browser_context.pages[0]
+                await self._apply_lite_mode(browser_context, page)
+            else:
+                page = await self._new_page(browser_context)
+        except Exception:
+            return
+        if page.url != 'about:blank':
+            try:
+                await page.goto('about:blank')
+            except Exception:
+                return
+        if browser_token not in self._active_sessions:
+            # 预热期间会话已被释放
+            return
+        page_queue = self._page_pools.setdefault(browser_token, asyncio.Queue(maxsize=self._max_idle_pages))
+        if page_queue.full():
+            return
+        self._page_use_counts[page] = 0
+        page_queue.put_nowait(page)
+
+    def _touch_session(self, browser_token: uuid.UUID) -> SessionInfo:
+        """更新会话的使用时间并移动到 LRU 队尾，调用方需持有 _pool_lock 且确认会话存在"""
+        session_info = self._active_sessions[browser_token]
+        session_info.last_used = time.time()
+        session_info.playwright_instance.update_activity_timestamp()
+        self._active_sessions.move_to_end(browser_token)
+        return session_info
+
+    def _evict_overflow_sessions(self, keep_token: uuid.UUID) -> List[Optional[SessionInfo]]:
+        """
+        会话数超过上限时，按最久未使用顺序移除会话（跳过远程控制中、有借出页面的会话和刚创建的会话），调用方需持有 _pool_lock。
+        可移除的会话都在使用中时允许暂时超出上限，等之后创建会话时再淘汰
+
+        Returns:
+            被移除的会话，需在锁外调用 _shutdown_sessions 关闭
+        """
+        overflow = len(self._active_sessions) - self._max_sessions
+        if overflow <= 0:
+            return []
+        evict_tokens = []
+        for browser_token, session_info in self._active_sessions.items():
+            if len(evict_tokens) >= overflow:
+                break
+            if (browser_token == keep_token or
+                    session_info.pages_in_use > 0 or
+                    session_info.playwright_instance.is_remote_control_active):
+                continue
+            evict_tokens.append(browser_token)
+        return [self._pop_session(browser_token) for browser_token in evict_tokens]
 
     async def release_session(self, browser_token: uuid.UUID):
         """
@@ -142,7 +259,8 @@ class PlaywrightSessionPool:
             browser_token: 浏览器令牌
         """
         async with self._pool_lock:
-            await self._close_session(browser_token)
+            session_info = self._pop_session(browser_token)
+        await self._shutdown_sessions([session_info])
 
     async def get_page(self, browser_token: uuid.UUID, headless: bool = True):
         """
@@ -155,13 +273,143 @@ class PlaywrightSessionPool:
         Returns:
             Page对象
         """
-        playwright_instance, browser_context = await self.get_session(browser_token, headless)
-        # 更新活动时间戳
-        playwright_instance.update_activity_timestamp()
+        # get_session 内已更新使用时间和 LRU 顺序，这里无需再次加锁
+        _, browser_context = await self.get_session(browser_token, headless)
+        session_info = self._active_sessions.get(browser_token)
+        page = await self._new_page(browser_context)
+        if session_info is not None:
+            session_info.pages_served += 1
+            # 实时画面等长期持有的页面不会归还，关闭前不允许重建上下文
+            session_info.live_pages += 1
+
+            def on_close(_page):
+                session_info.live_pages -= 1
+
+            page.once('close', on_close)
+        return page
+
+    async def acquire_page(self, browser_token: uuid.UUID, headless: bool = True) -> "Page":
+        """
+        从页面池中借出一个页面，池中没有可用页面时新建，用完后需调用 release_page 归还
+
+        Args:
+            browser_token: 浏览器令牌
+            headless: 是否以无头模式运行
+
+        Returns:
+            Page对象
+        """
+        _, browser_context = await self.get_session(browser_token, headless)
+        session_info = self._active_sessions.get(browser_token)
+        page = None
+        page_queue = self._page_pools.get(browser_token)
+        while page_queue is not None and not page_queue.empty():
+            candidate = page_queue.get_nowait()
+            if not candidate.is_closed():
+                page = candidate
+                break
+            self._page_use_counts.pop(candidate, None)
+        if page is None:
+            # 新建失败时尚未计数，异常直接抛给调用方
+            page = await self._new_page(browser_context)
+            self._page_use_counts[page] = 0
+        # 拿到页面后再计数，保证每次计数都有对应的 release_page
+        if session_info is not None:
+            session_info.pages_served += 1
+            session_info.pages_in_use += 1
+            self._page_owners[page] = session_info
+        return page
+
+    @staticmethod
+    async def _new_page(browser_context: "BrowserContext") -> "Page":
+        """新建页面，精简模式下同时屏蔽图片、字体和音视频"""
+        page = await browser_context.new_page()
+        await PlaywrightSessionPool._apply_lite_mode(browser_context, page)
+        return page
+
+    @staticmethod
+    async def _apply_lite_mode(browser_context: "BrowserContext", page: "Page"):
+        if not settings.browser_lite_mode:
+            return
+        try:
+            cdp = await browser_context.new_cdp_session(page)
+            await cdp.send('Network.enable')
+            await cdp.send('Network.setBlockedURLs', {'urls': _LITE_MODE_BLOCKED_URLS})
+        except Exception:
+            # 屏蔽失败不影响页面正常使用
+            pass
+
+    async def release_page(self, browser_token: uuid.UUID, page: "Page"):
+        """
+        归还页面到页面池，超过复用次数或池已满时直接关闭
+
+        Args:
+            browser_token: 浏览器令牌
+            page: 通过 acquire_page 借出的页面
+        """
+        session_info = self._page_owners.pop(page, None)
+        if session_info is not None and session_info.pages_in_use > 0:
+            session_info.pages_in_use -= 1
+        try:
+            await self._return_page(browser_token, page, session_info)
+        finally:
+            if session_info is not None:
+                await self._recycle_context_if_needed(browser_token, session_info)
+
+    async def _return_page(self, browser_token: uuid.UUID, page: "Page", session_info: Optional[SessionInfo]):
+        if page.is_closed():
+            self._page_use_counts.pop(page, None)
+            return
+        use_count = self._page_use_counts.get(page, 0) + 1
+        self._page_use_counts[page] = use_count
+        # 借出期间会话被移除或重建时，页面属于旧的上下文，不能放回新会话的页面池
+        if (session_info is None or self._active_sessions.get(browser_token) is not session_info or
+                use_count >= self._page_recycle_uses):
+            await self._discard_page(page)
+            return
+        page_queue = self._page_pools.setdefault(browser_token, asyncio.Queue(maxsize=self._max_idle_pages))
+        if page_queue.full():
+            await self._discard_page(page)
+            return
+        try:
+            # 重置页面状态，释放上一次请求加载的资源
+            await page.goto('about:blank')
+        except Exception:
+            await self._discard_page(page)
+            return
+        page_queue.put_nowait(page)
+
+    async def _recycle_context_if_needed(self, browser_token: uuid.UUID, session_info: SessionInfo):
+        """
+        上下文提供的页面数达到上限且没有借出中的页面时关闭该会话，下次请求会重新启动浏览器。
+        persistent context 的 cookies、localStorage 保存在 user_data_dir 中，重建后不会丢失
+        """
+        if (session_info.pages_served < self._max_pages_per_context or
+                session_info.pages_in_use > 0 or
+                session_info.live_pages > 0 or
+                session_info.playwright_instance.is_remote_control_active):
+            return
         async with self._pool_lock:
-            if browser_token in self._active_sessions:
-                self._active_sessions[browser_token].last_used = time.time()
-        return await browser_context.new_page()
+            # 期间会话可能已被释放或重建
+            if (self._active_sessions.get(browser_token) is not session_info or
+                    session_info.pages_in_use > 0 or session_info.live_pages > 0):
+                return
+            removed = self._pop_session(browser_token)
+        await self._shutdown_sessions([removed])
+
+    async def _discard_page(self, page: "Page"):
+        """关闭页面并清除其复用计数"""
+        self._page_use_counts.pop(page, None)
+        try:
+            await page.close()
+        except Exception:
+            pass
+
+    def _drop_page_pool(self, browser_token: uuid.UUID):
+        """丢弃会话的空闲页面队列，页面会随浏览器上下文一起关闭"""
+        page_queue = self._page_pools.pop(browser_token, None)
+        while page_queue is not None and not page_queue.empty():
+            self._page_use_counts.pop(page_queue.get_nowait(), None)
 
     async def start_remote_control(self, browser_token: uuid.UUID):
         """
@@ -172,10 +420,8 @@ class PlaywrightSessionPool:
         """
         async with self._pool_lock:
             if browser_token in self._active_sessions:
-                session_info = self._active_sessions[browser_token]
+                session_info = self._touch_session(browser_token)
                 session_info.playwright_instance.is_remote_control_active = True
-                session_info.last_used = time.time()
-                session_info.playwright_instance.update_activity_timestamp()
 
     async def stop_remote_control(self, browser_token: uuid.UUID):
         """
@@ -186,10 +432,8 @@ class PlaywrightSessionPool:
         """
         async with self._pool_lock:
             if browser_token in self._active_sessions:
-                session_info = self._active_sessions[browser_token]
+                session_info = self._touch_session(browser_token)
                 session_info.playwright_instance.is_remote_control_active = False
-                session_info.last_used = time.time()
-                session_info.playwright_instance.update_activity_timestamp()
 
     async def is_remote_control_active(self, browser_token: uuid.UUID) -> bool:
         """
@@ -209,12 +453,11 @@ class PlaywrightSessionPool:
 
     async def _cleanup_oldest_session(self):
         """
-        清理最旧的会话（按创建时间）
+        清理最久未使用的会话
         """
         if self._active_sessions:
-            # 找到创建时间最早的会话
-            oldest_token = min(self._active_sessions.keys(),
-                               key=lambda k: self._active_sessions[k].created_at)
+            # 有序字典的第一个元素即为最久未使用的会话
+            oldest_token = next(iter(self._active_sessions))
             await self.release_session(oldest_token)
 
     async def cleanup_all_sessions(self):
@@ -222,9 +465,8 @@ class PlaywrightSessionPool:
         清理所有活跃会话
         """
         async with self._pool_lock:
-            sessions_to_close = list(self._active_sessions.keys())
-            for browser_token in sessions_to_close:
-                await self.release_session(browser_token)
+            removed_sessions = [self._pop_session(browser_token) for browser_token in list(self._active_sessions)]
+        await self._shutdown_sessions(removed_sessions)
 
 
 # 全局单例实例
@@ -240,7 +482,7 @@ def get_default_session_pool() -> PlaywrightSessionPool:
     """
     global _default_session_pool
     if _default_session_pool is None:
-        _default_session_pool = PlaywrightSessionPool()
+        _default_session_pool = PlaywrightSessionPool(max_sessions=settings.max_browser_sessions)
     return _default_session_pool
 
 
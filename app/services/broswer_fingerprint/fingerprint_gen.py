@@ -19,6 +19,12 @@ mobile_fingerprint_generator = DefaultFingerprintGenerator(
         devices=['mobile'],
     ),
 )
+_BROWSER_CHOICES = tuple(BrowserEnum)
+_PLATFORM_MAP = {
+    'Win32': PlatformEnum.windows,
+    'MacIntel': PlatformEnum.macos,
+    'Linux x86_64': PlatformEnum.linux,
+}
 
 
 def gen_from_browserforge_fingerprint(
@@ -33,13 +39,8 @@ def gen_from_browserforge_fingerprint(
         rand_fingerprint: Fingerprint = desktop_fingerprint_generator.generate()
     else:
         rand_fingerprint: Fingerprint = mobile_fingerprint_generator.generate()
-    bf_fingerprint_hashmap = {
-        'Win32': PlatformEnum.windows,
-        'MacIntel': PlatformEnum.macos,
-        'Linux x86_64': PlatformEnum.linux,
-    }
-    platform = bf_fingerprint_hashmap.get(rand_fingerprint.navigator.platform, PlatformEnum.windows)
-    brand = random.choice(list(BrowserEnum))
+    platform = _PLATFORM_MAP.get(rand_fingerprint.navigator.platform, PlatformEnum.windows)
+    brand = random.choice(_BROWSER_CHOICES)
     brand_version = rand_fingerprint.navigator.userAgentData.get('uaFullVersion')
     platform_version = rand_fingerprint.navigator.userAgentData.get('platformVersion')
     return BaseFingerprintBrowserInitParams(
@@ -1,20 +1,97 @@
 import cv2
 import aiohttp
 import asyncio
-import tempfile
+import os
+import json
+import hashlib
+import importlib.util
+import shutil
+from collections import OrderedDict
+from concurrent.futures import Executor, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple, Union
+from typing import Any, Callable, List, Dict, Optional, Tuple, Union
 from ultralytics import YOLO
 from modelscope import snapshot_download
 import torch
 import numpy as np
-from io import BytesIO
-from PIL import Image
-from loguru import logger
 
+from app.config import settings
 from app.utils.decorator import log_class_decorator
 
 
+# 识别结果缓存容量，验证码图片在短时间内经常重复出现
+CAPTCHA_RESULT_CACHE_MAXSIZE = 1024
+# 导出产物所在目录的后缀，目录与原始模型同级，查找模型文件时跳过
+MODEL_EXPORT_DIR_SUFFIX = '_exports'
+
+
+class _BatchScheduler:
+    """
+    将并发的单张推理请求合并为一个批次，减少模型调用次数，提高 GPU 利用率
+    """
+
+    def __init__(self, run_batch: Callable[[List[np.ndarray], float, Tuple[int, int]], List[Any]],
+                 executor: Executor, max_batch: int = 16, max_wait_ms: float = 8):
+        """
+        Args:
+            run_batch: 同步批量推理函数，接收图像列表、置信度阈值和推理尺寸，按顺序返回每张图像的结果
+            executor: 执行 run_batch 的线程池
+            max_batch: 单个批次的最大图像数
+            max_wait_ms: 收到第一张图像后等待凑批的最长时间（毫秒）
+        """
+        self._run_batch = run_batch
+        self._executor = executor
+        self.max_batch = max_batch
+        self._max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_task: Optional[asyncio.Task] = None
+
+    async def submit(self, image: np.ndarray, confidence_threshold: float, imgsz: Tuple[int, int]) -> Any:
+        """提交一张图像，等待所在批次推理完成后返回该图像的结果"""
+        if self._worker_task is None or self._worker_task.done():
+            # 实例在导入时创建，此时可能还没有事件循环，首次提交时再启动后台任务
+            self._queue = asyncio.Queue()
+            self._worker_task = asyncio.create_task(self._worker())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((image, confidence_threshold, tuple(imgsz), future))
+        return await future
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self._max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # 同一次模型调用只能使用一个推理尺寸，按尺寸分组
+            groups: Dict[Tuple[int, int], list] = {}
+            for item in batch:
+                groups.setdefault(item[2], []).append(item)
+            for imgsz, group in groups.items():
+                await self._run_group(loop, group, imgsz)
+
+    async def _run_group(self, loop: asyncio.AbstractEventLoop, group: list, imgsz: Tuple[int, int]):
+        images = [image for image, _, _, _ in group]
+        # 以批次内最低的阈值推理，各请求再按自己的阈值过滤
+        confidence_threshold = min(conf for _, conf, _, _ in group)
+        try:
+            results = await loop.run_in_executor(self._executor, self._run_batch, images, confidence_threshold, imgsz)
+        except Exception as e:
+            for _, _, _, future in group:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, _, _, future), result in zip(group, results):
+            if not future.done():
+                future.set_result(result)
+
+
 @log_class_decorator.decorator
 class AsyncCaptchaBreaker:
     """
@@ -22,6 +99,10 @@ class AsyncCaptchaBreaker:
     返回的都是后面一半是提示目标，前面一半才是点击目标的坐标
     坐标以左上角为原点，向右为x轴正方向，向下为y轴正方向
     """
+    # 文件读写、模型下载等 IO 使用的线程池，默认线程池线程过多，并发识别时频繁切换线程
+    _io_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='captcha-io')
+    # 模型加载、导出和推理固定在同一个线程，CUDA/TensorRT 上下文不会被多个线程争用
+    _infer_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='captcha-infer')
 
     def __init__(self, model_name: str = 'Amorter/CaptchaBreakerModels', device: Optional[str] = None):
         """
@@ -36,32 +117,63 @@ class AsyncCaptchaBreaker:
         self.model = None
         self.model_dir = None
         self._session = None
-        self.logger = logger
+        self._batch_scheduler = _BatchScheduler(self._run_batch, self._infer_pool)
+        # PyTorch 权重在 CUDA 上以 FP16 推理
+        self._half = False
+        # (图片内容摘要, 置信度阈值, 目标尺寸) -> 检测结果，按最近使用顺序排列
+        self._result_cache: OrderedDict[Tuple[bytes, float, Tuple[int, int]], List[Dict]] = OrderedDict()
+        self._cache_hits = 0
+        self._cache_misses = 0
 
     async def __aenter__(self):
         """异步上下文管理器入口"""
-        await self._load_model()
-        self._session = aiohttp.ClientSession()
+        if not self.model:
+            await self._load_model()
+        self._get_session()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """异步上下文管理器出口"""
-        if self._session:
+        """异步上下文管理器出口，单例会被多次进入，HTTP 会话保留到进程退出时调用 close"""
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """懒加载复用的 HTTP 会话，保持与验证码图片 CDN 的连接和 DNS 缓存"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=32, limit_per_host=8, ttl_dns_cache=300, keepalive_timeout=30),
+                timeout=aiohttp.ClientTimeout(total=30)
+            )
+        return self._session
+
+    async def close(self):
+        """关闭 HTTP 会话"""
+        if self._session is not None and not self._session.closed:
             await self._session.close()
+        self._session = None
 
     async def _load_model(self):
         """异步加载YOLO11模型"""
         try:
-            # 异步下载模型（使用线程池执行同步操作）
+            # 异步下载并查找模型文件（使用线程池执行同步操作）
             loop = asyncio.get_event_loop()
-            self.model_dir = await loop.run_in_executor(None, snapshot_download, self.model_name)
-
-            # 查找模型文件
-            model_path = self._find_model_file()
+            model_path = await loop.run_in_executor(self._io_pool, self._resolve_model_path)
 
             if model_path:
+                model_path = await self._ensure_engine(model_path)
+                model_path = await self._ensure_openvino(model_path)
                 # 异步加载YOLO模型
-                self.model = await loop.run_in_executor(None, YOLO, model_path)
+                self.model = await loop.run_in_executor(self._infer_pool, YOLO, model_path)
+                # 模型变化后旧的识别结果不再可信
+                self._result_cache.clear()
+                # 导出的 TensorRT/OpenVINO 及 ONNX 模型输入形状固定为 batch=1，只有 PyTorch 权重支持动态批次
+                is_torch_model = isinstance(self.model.model, torch.nn.Module)
+                self._batch_scheduler.max_batch = 16 if is_torch_model else 1
+                if is_torch_model:
+                    # 只做推理，加载时一次性切换到 eval 模式
+                    self.model.model.eval()
+                # 交给 ultralytics 的 half 参数转换权重和输入，直接调用 model.half() 会被预测器重新转回 float32
+                self._half = is_torch_model and self.device == 'cuda'
+                if is_torch_model and settings.captcha_torch_compile:
+                    await loop.run_in_executor(self._infer_pool, self._compile_model)
                 self.logger.info(f"模型加载成功，设备: {self.device}")
             else:
                 raise FileNotFoundError(f"在 {self.model_dir} 中未找到合适的模型文件")
@@ -69,101 +181,285 @@ class AsyncCaptchaBreaker:
         except Exception as e:
             raise RuntimeError(f"模型加载失败: {str(e)}")
 
-    def _find_model_file(self) -> Optional[str]:
-        """在下载的模型目录中查找模型文件"""
-        # 优先查找YOLO相关的模型文件
-        yolo_patterns = ['yolo', 'yolov11']
-
-        for pattern in yolo_patterns:
-            for file_path in Path(self.model_dir).rglob(f'*{pattern}*.onnx'):
-                if file_path.is_file():
-                    self.logger.info(f"找到YOLO模型文件: {file_path}")
-                    return str(file_path)
-
-        # 如果没有找到YOLO模型，查找其他ONNX文件
-        for file_path in Path(self.model_dir).rglob('*.onnx'):
-            if file_path.is_file():
-                self.logger.info(f"找到ONNX模型文件: {file_path}")
-                return str(file_path)
-
-        # 最后查找其他格式的模型文件
-        model_extensions = ['.pt', '.pth']
-        for ext in model_extensions:
-            for file_path in Path(self.model_dir).rglob(f'*{ext}'):
-                if file_path.is_file():
-                    self.logger.info(f"找到模型文件: {file_path}")
-                    return str(file_path)
-
-        self.logger.warning(f"在 {self.model_dir} 中未找到合适的模型文件")
-        return None
+    async def _ensure_engine(self, model_path: str, imgsz: int = 96) -> str:
+        """
+        GPU 环境下将 .pt 模型导出为 TensorRT 引擎并缓存在导出目录中，之后优先直接加载已有的引擎
 
-    async def _download_image_from_url(self, url: str, timeout: int = 30) -> np.ndarray:
+        Args:
+            model_path: 原始模型文件路径
+            imgsz: 导出时的输入尺寸，与 predict 的 target_size 保持一致
+
+        Returns:
+            str: 可加载的模型路径，无法导出时返回原始路径
         """
-        异步从URL下载图像并转换为OpenCV格式
-        
+        # TensorRT 只支持 CUDA，且 ultralytics 只能从 .pt 权重导出
+        if self.device != 'cuda' or Path(model_path).suffix != '.pt':
+            return model_path
+        int8 = settings.captcha_trt_int8 and bool(settings.captcha_trt_calib_data)
+        engine_path = self._export_dir(model_path) / f"{Path(model_path).stem}{'.int8' if int8 else ''}.engine"
+        if engine_path.is_file():
+            return str(engine_path)
+
+        def export() -> str:
+            exported = self._export_model(
+                model_path,
+                format='engine',
+                half=True,
+                int8=int8,
+                data=settings.captcha_trt_calib_data if int8 else None,
+                imgsz=imgsz,
+                workspace=2,
+                batch=1,
+                device=0,
+            )
+            Path(exported).replace(engine_path)
+            return str(engine_path)
+
+        try:
+            loop = asyncio.get_event_loop()
+            path = await loop.run_in_executor(self._infer_pool, export)
+            self.logger.info(f"TensorRT 引擎导出成功: {path}")
+            return path
+        except Exception as e:
+            self.logger.warning(f"TensorRT 引擎导出失败，使用原始模型: {e}")
+            return model_path
+
+    async def _ensure_openvino(self, model_path: str, imgsz: int = 96) -> str:
+        """
+        CPU 环境下安装了 openvino 时，将 .pt 模型导出为 OpenVINO 格式并缓存在导出目录中，避免 PyTorch 的算子调度开销
+
         Args:
-            url: 图像URL
-            timeout: 请求超时时间（秒）
-            
+            model_path: 原始模型文件路径
+            imgsz: 导出时的输入尺寸，与 predict 的 target_size 保持一致
+
         Returns:
-            np.ndarray: OpenCV格式的图像数组
+            str: 可加载的模型路径，无法导出时返回原始路径
         """
-        if not self._session:
-            raise RuntimeError("会话未初始化，请使用异步上下文管理器")
+        # .onnx 模型本身已由 ultralytics 通过 ONNX Runtime 推理，无需处理
+        if self.device != 'cpu' or Path(model_path).suffix != '.pt':
+            return model_path
+        if importlib.util.find_spec('openvino') is None:
+            return model_path
+        # 与 ultralytics 默认的导出目录命名一致
+        openvino_dir = self._export_dir(model_path) / f'{Path(model_path).stem}_openvino_model'
+        if openvino_dir.is_dir():
+            return str(openvino_dir)
+
+        def export() -> str:
+            return str(self._export_model(model_path, format='openvino', half=True, imgsz=imgsz, batch=1))
 
         try:
-            # 异步发送HTTP请求获取图像
-            async with self._session.get(url, timeout=timeout) as response:
-                response.raise_for_status()  # 检查请求是否成功
+            loop = asyncio.get_event_loop()
+            path = await loop.run_in_executor(self._infer_pool, export)
+            self.logger.info(f"OpenVINO 模型导出成功: {path}")
+            return path
+        except Exception as e:
+            self.logger.warning(f"OpenVINO 模型导出失败，使用原始模型: {e}")
+            return model_path
 
-                # 读取图像数据
-                image_data = await response.read()
+    @staticmethod
+    def _export_dir(model_path: str) -> Path:
+        """模型导出产物的目录，与原始模型文件分开存放"""
+        return Path(model_path).with_name(f'{Path(model_path).stem}{MODEL_EXPORT_DIR_SUFFIX}')
 
-                # 使用线程池处理图像转换（避免阻塞事件循环）
-                loop = asyncio.get_event_loop()
-                pil_image = await loop.run_in_executor(None, Image.open, BytesIO(image_data))
+    def _export_model(self, model_path: str, **export_kwargs) -> Path:
+        """
+        在导出目录中放一份权重副本再导出，导出结果落在导出目录内，并删除导出过程中生成的中间 ONNX 文件
+
+        直接从原始权重导出时，TensorRT 导出的中间 .onnx 会留在原始模型旁边，之后查找模型文件时会被优先选中
 
-                # 转换为OpenCV格式
-                if pil_image.mode == 'RGBA':
-                    pil_image = await loop.run_in_executor(None, pil_image.convert, 'RGB')
+        Args:
+            model_path: 原始 .pt 模型文件路径
+            **export_kwargs: 传给 YOLO.export 的参数
+
+        Returns:
+            Path: 导出结果的路径
+        """
+        export_dir = self._export_dir(model_path)
+        export_dir.mkdir(parents=True, exist_ok=True)
+        source = export_dir / Path(model_path).name
+        shutil.copyfile(model_path, source)
+        try:
+            return Path(YOLO(str(source)).export(**export_kwargs))
+        finally:
+            source.unlink(missing_ok=True)
+            if export_kwargs.get('format') != 'onnx':
+                source.with_suffix('.onnx').unlink(missing_ok=True)
+
+    @staticmethod
+    def _is_export_leftover(model_path: str) -> bool:
+        """旧版本直接在原始模型旁导出 TensorRT 引擎时遗留的中间 ONNX 文件"""
+        if not model_path.endswith('.onnx'):
+            return False
+        stem = model_path[:-len('.onnx')]
+        return os.path.isfile(f'{stem}.engine') or os.path.isfile(f'{stem}.int8.engine')
+
+    @staticmethod
+    def _model_file_rank(file_name: str) -> Optional[int]:
+        """模型文件的优先级，数字越小越优先：YOLO ONNX > 其他 ONNX > .pt > .pth"""
+        if file_name.endswith('.onnx'):
+            return 0 if 'yolo' in file_name else 1
+        if file_name.endswith('.pt'):
+            return 2
+        if file_name.endswith('.pth'):
+            return 3
+        return None
 
-                # 将PIL图像转换为numpy数组
-                cv_image = await loop.run_in_executor(None, np.array, pil_image)
+    def _find_model_file(self) -> Optional[str]:
+        """在下载的模型目录中查找模型文件，一次遍历按优先级选出最合适的文件"""
+        best_path, best_rank = None, None
+        pending_dirs = [self.model_dir]
+        while pending_dirs:
+            with os.scandir(pending_dirs.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        # 导出目录中只有导出产物，由 _ensure_engine/_ensure_openvino 按设备选用
+                        if not entry.name.endswith(MODEL_EXPORT_DIR_SUFFIX):
+                            pending_dirs.append(entry.path)
+                        continue
+                    rank = self._model_file_rank(entry.name)
+                    if rank is None or not entry.is_file() or (best_rank is not None and rank >= best_rank):
+                        continue
+                    if self._is_export_leftover(entry.path):
+                        continue
+                    best_path, best_rank = entry.path, rank
+                    if rank == 0:
+                        # 已是最高优先级，无需继续遍历
+                        self.logger.info(f"找到模型文件: {best_path}")
+                        return best_path
+
+        if best_path is None:
+            self.logger.warning(f"在 {self.model_dir} 中未找到合适的模型文件")
+        else:
+            self.logger.info(f"找到模型文件: {best_path}")
+        return best_path
+
+    def _model_path_cache_file(self) -> Path:
+        """记录已解析模型路径的缓存文件"""
+        digest = hashlib.sha1(self.model_name.encode('utf-8')).hexdigest()
+        return Path.home() / '.cache' / 'captcha_breaker' / f'{digest}.json'
+
+    def _resolve_model_path(self) -> Optional[str]:
+        """
+        获取模型文件路径，上次解析的路径仍然存在时直接使用，跳过 snapshot_download 和目录遍历
+        """
+        cache_file = self._model_path_cache_file()
+        try:
+            cached = json.loads(cache_file.read_text(encoding='utf-8'))
+            if Path(cached['model_path']).is_file() and not self._is_export_leftover(cached['model_path']):
+                self.model_dir = cached['model_dir']
+                return cached['model_path']
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+        self.model_dir = snapshot_download(self.model_name)
+        model_path = self._find_model_file()
+        if model_path:
+            try:
+                cache_file.parent.mkdir(parents=True, exist_ok=True)
+                cache_file.write_text(
+                    json.dumps({'model_dir': self.model_dir, 'model_path': model_path}), encoding='utf-8'
+                )
+            except OSError as e:
+                self.logger.warning(f"写入模型路径缓存失败: {e}")
+        return model_path
 
-                # 如果图像是RGB格式，转换为BGR（OpenCV默认格式）
-                if len(cv_image.shape) == 3 and cv_image.shape[2] == 3:
-                    cv_image = await loop.run_in_executor(None, cv2.cvtColor, cv_image, cv2.COLOR_RGB2BGR)
+    async def _fetch_image_bytes(self, url: str, timeout: Optional[int] = None) -> bytes:
+        """
+        异步从URL下载图像的原始字节
 
-                return cv_image
+        Args:
+            url: 图像URL
+            timeout: 请求超时时间（秒），为None时使用会话默认的30秒
+
+        Returns:
+            bytes: 图像文件内容
+        """
+        session = self._get_session()
+
+        try:
+            # 异步发送HTTP请求获取图像
+            request_kwargs = {} if timeout is None else {'timeout': aiohttp.ClientTimeout(total=timeout)}
+            async with session.get(url, **request_kwargs) as response:
+                response.raise_for_status()  # 检查请求是否成功
+                return await response.read()
 
         except aiohttp.ClientError as e:
             raise RuntimeError(f"下载图像失败: {str(e)}")
-        except Exception as e:
-            raise RuntimeError(f"处理图像失败: {str(e)}")
 
-    async def _save_temp_image(self, image: np.ndarray) -> str:
+    @staticmethod
+    def _decode_image(image_data: bytes, source: str) -> np.ndarray:
         """
-        异步将图像保存为临时文件
+        将图像字节解码为OpenCV格式
+
+        Args:
+            image_data: 图像文件内容
+            source: 图像来源，用于错误信息
+
+        Returns:
+            np.ndarray: OpenCV格式的图像数组
+        """
+        # 验证码图片很小，解码耗时远低于一次线程池调度，直接解码；imdecode 输出 BGR 三通道，透明通道会被丢弃
+        cv_image = cv2.imdecode(np.frombuffer(image_data, np.uint8), cv2.IMREAD_COLOR)
+        if cv_image is None:
+            raise ValueError(f"无法解码图像: {source}")
+        return cv_image
+
+    async def _download_image_from_url(self, url: str, timeout: Optional[int] = None) -> np.ndarray:
+        """
+        异步从URL下载图像并转换为OpenCV格式
         
         Args:
-            image: OpenCV格式的图像数组
+            url: 图像URL
+            timeout: 请求超时时间（秒），为None时使用会话默认的30秒
             
         Returns:
-            str: 临时文件路径
+            np.ndarray: OpenCV格式的图像数组
         """
+        image_data = await self._fetch_image_bytes(url, timeout)
         try:
-            # 创建临时文件
-            with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as temp_file:
-                temp_path = temp_file.name
+            return self._decode_image(image_data, url)
+        except Exception as e:
+            raise RuntimeError(f"处理图像失败: {str(e)}")
 
-            # 异步保存图像
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, cv2.imwrite, temp_path, image)
+    async def _predict_bytes(self, image_data: bytes, source: str, confidence_threshold: float,
+                             target_size: Tuple[int, int]) -> List[Dict[str, float]]:
+        """
+        按图像内容摘要查询识别结果缓存，未命中时解码并推理
 
-            return temp_path
+        Args:
+            image_data: 图像文件内容
+            source: 图像来源，用于错误信息
+            confidence_threshold: 置信度阈值
+            target_size: 目标图像尺寸 (width, height)
 
-        except Exception as e:
-            raise RuntimeError(f"保存临时图像失败: {str(e)}")
+        Returns:
+            List[Dict]: 检测结果的副本，调用方可以自由修改
+        """
+        key = (hashlib.blake2b(image_data, digest_size=16).digest(), confidence_threshold, tuple(target_size))
+        detections = self._result_cache.get(key)
+        if detections is not None:
+            self._cache_hits += 1
+            self._result_cache.move_to_end(key)
+        else:
+            self._cache_misses += 1
+            cv_image = self._decode_image(image_data, source)
+            detections = await self.predict_image(cv_image, confidence_threshold, target_size)
+            self._result_cache[key] = detections
+            if len(self._result_cache) > CAPTCHA_RESULT_CACHE_MAXSIZE:
+                self._result_cache.popitem(last=False)
+        return [dict(det) for det in detections]
+
+    def cache_stats(self) -> Dict:
+        """识别结果缓存的命中统计"""
+        total = self._cache_hits + self._cache_misses
+        return {
+            'hits': self._cache_hits,
+            'misses': self._cache_misses,
+            'hit_rate': self._cache_hits / total if total else 0.0,
+            'size': len(self._result_cache),
+            'maxsize': CAPTCHA_RESULT_CACHE_MAXSIZE
+        }
 
     async def predict(self, image_path: str, confidence_threshold: float = 0.5,
                       target_size: Tuple[int, int] = (96, 96)) -> List[Dict[str, float]]:
@@ -181,99 +477,150 @@ class AsyncCaptchaBreaker:
         if not self.model:
             raise RuntimeError("模型未加载")
 
-        # 验证图像文件存在
-        if not await asyncio.get_event_loop().run_in_executor(None, Path(image_path).exists):
+        # 验证图像文件存在，单次 stat 直接调用即可，不值得切换线程
+        if not Path(image_path).exists():
             raise FileNotFoundError(f"图像文件不存在: {image_path}")
 
-        try:
-            # 异步读取图像并调整尺寸
-            loop = asyncio.get_event_loop()
-            original_image = await loop.run_in_executor(None, cv2.imread, image_path)
-            if original_image is None:
-                raise ValueError(f"无法读取图像: {image_path}")
-
-            # 调整图像尺寸到目标尺寸
-            resized_image = await loop.run_in_executor(
-                None,
-                cv2.resize,
-                original_image,
-                target_size
-            )
+        # 异步读取图像内容，相同内容的图像直接使用缓存的识别结果
+        loop = asyncio.get_event_loop()
+        image_data = await loop.run_in_executor(self._io_pool, Path(image_path).read_bytes)
+        return await self._predict_bytes(image_data, image_path, confidence_threshold, target_size)
 
-            # 保存调整后的临时图像
-            with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as temp_file:
-                temp_path = temp_file.name
+    async def predict_image(self, original_image: np.ndarray, confidence_threshold: float = 0.5,
+                            target_size: Tuple[int, int] = (96, 96)) -> List[Dict[str, float]]:
+        """
+        异步对内存中的验证码图像进行预测，原图直接送入模型，由 YOLO 按 target_size 缩放，返回的坐标即原图坐标
 
-            await loop.run_in_executor(None, cv2.imwrite, temp_path, resized_image)
+        Args:
+            original_image: OpenCV格式(BGR)的图像数组
+            confidence_threshold: 置信度阈值
+            target_size: 目标图像尺寸 (width, height)，默认为(96, 96)
 
-            try:
-                # 使用调整后的图像进行预测
-                results = await loop.run_in_executor(
-                    None,
-                    lambda: self.model(temp_path, conf=confidence_threshold, device=self.device)
-                )
+        Returns:
+            List[Dict]: 每个检测到的目标信息，包含坐标和置信度
+        """
+        if not self.model:
+            raise RuntimeError("模型未加载")
 
-                # 解析结果
-                detections = []
-
-                for result in results:
-                    if result.boxes is not None:
-                        boxes = result.boxes.xyxy.cpu().numpy()  # 边界框坐标 [x1, y1, x2, y2]
-                        confidences = result.boxes.conf.cpu().numpy()  # 置信度
-
-                        # 获取原始图像尺寸以进行坐标缩放
-                        original_height, original_width = original_image.shape[:2]
-                        scale_x = original_width / target_size[0]
-                        scale_y = original_height / target_size[1]
-
-                        for i, (box, conf) in enumerate(zip(boxes, confidences)):
-                            x1, y1, x2, y2 = box
-
-                            # 将坐标缩放回原始图像尺寸
-                            x1 = x1 * scale_x
-                            y1 = y1 * scale_y
-                            x2 = x2 * scale_x
-                            y2 = y2 * scale_y
-
-                            # 计算中心点坐标
-                            center_x = (x1 + x2) / 2
-                            center_y = (y1 + y2) / 2
-
-                            # 计算宽度和高度
-                            width = x2 - x1
-                            height = y2 - y1
-
-                            detection = {
-                                'center_x': float(center_x),
-                                'center_y': float(center_y),
-                                'x1': float(x1),
-                                'y1': float(y1),
-                                'x2': float(x2),
-                                'y2': float(y2),
-                                'width': float(width),
-                                'height': float(height),
-                                'confidence': float(conf),
-                                'class_id': int(result.boxes.cls[i].item()) if result.boxes.cls is not None else 0,
-                                'original_width': original_width,
-                                'original_height': original_height,
-                                'target_width': target_size[0],
-                                'target_height': target_size[1]
-                            }
-
-                            detections.append(detection)
-
-                return detections
-
-            except Exception as e:
-                raise RuntimeError(f"预测失败: {str(e)}")
-            finally:
-                # 清理临时文件
-                if 'temp_path' in locals():
-                    await loop.run_in_executor(None, lambda: Path(temp_path).unlink(missing_ok=True))
+        try:
+            # 并发请求由调度器合并为批次，ultralytics 的 imgsz 为 (height, width)
+            imgsz = (target_size[1], target_size[0])
+            results = [await self._batch_scheduler.submit(original_image, confidence_threshold, imgsz)]
+
+            # 解析结果
+            detections = []
+
+            for result in results:
+                if result.boxes is not None and len(result.boxes):
+                    # boxes.data 每行为 [x1, y1, x2, y2, conf, cls]，一次拷回主机后再切片，避免分别拷贝三次
+                    data = result.boxes.data.cpu().numpy()
+                    boxes = data[:, :4].astype(np.float32)  # 边界框坐标 [x1, y1, x2, y2]
+                    confidences = data[:, 4]  # 置信度
+                    class_ids = data[:, 5].astype(np.int32)
+
+                    # 批次按最低阈值推理，这里按本次请求的阈值过滤
+                    keep = confidences >= confidence_threshold
+                    boxes, confidences, class_ids = boxes[keep], confidences[keep], class_ids[keep]
+
+                    # 一次性计算所有目标的中心点和宽高
+                    centers = (boxes[:, :2] + boxes[:, 2:]) * 0.5
+                    sizes = boxes[:, 2:] - boxes[:, :2]
+
+                    original_height, original_width = result.orig_shape
+                    detections.extend(
+                        {
+                            'center_x': center_x,
+                            'center_y': center_y,
+                            'x1': x1,
+                            'y1': y1,
+                            'x2': x2,
+                            'y2': y2,
+                            'width': width,
+                            'height': height,
+                            'confidence': conf,
+                            'class_id': class_id,
+                            'original_width': original_width,
+                            'original_height': original_height,
+                            'target_width': target_size[0],
+                            'target_height': target_size[1]
+                        }
+                        for (x1, y1, x2, y2), (center_x, center_y), (width, height), conf, class_id in zip(
+                            boxes.tolist(), centers.tolist(), sizes.tolist(), confidences.tolist(), class_ids.tolist()
+                        )
+                    )
+
+            return detections
 
         except Exception as e:
             raise RuntimeError(f"预测失败: {str(e)}")
 
+    def _compile_model(self, imgsz: int = 96):
+        """
+        用 torch.compile 编译预测器实际调用的模型并预热，编译未生效或失败时保留原模型
+
+        ultralytics 在创建预测器时会用 AutoBackend 包装并 fuse 模型，直接编译 self.model.model 会被 fuse 拿回未编译的模块，
+        因此先推理一次创建预测器，再替换 predictor.model.model
+        """
+        if tuple(int(part) for part in torch.__version__.split('+')[0].split('.')[:2]) < (2, 1):
+            self.logger.warning(f"torch {torch.__version__} 不支持 torch.compile，跳过编译")
+            return
+        from torch._dynamo.utils import counters
+
+        warmup = [np.zeros((imgsz, imgsz, 3), dtype=np.uint8)]
+        # 第一次推理创建预测器
+        self._run_batch(warmup, 0.5, (imgsz, imgsz))
+        backend = getattr(self.model.predictor, 'model', None)
+        original_module = getattr(backend, 'model', None)
+        if not isinstance(original_module, torch.nn.Module):
+            self.logger.warning("预测器模型不是 PyTorch 模块，跳过编译")
+            return
+        try:
+            graphs_before = counters['stats']['unique_graphs']
+            # 调度器合并出的批次大小不固定，按动态形状编译；不使用 CUDA Graph（reduce-overhead），
+            # 否则每种批次大小仍会重新录制一次
+            backend.model = torch.compile(original_module, mode='default', dynamic=True)
+            # 分别以 1 张和 2 张图像预热，触发编译并覆盖动态批次
+            self._run_batch(warmup, 0.5, (imgsz, imgsz))
+            self._run_batch(warmup * 2, 0.5, (imgsz, imgsz))
+            compiled_graphs = counters['stats']['unique_graphs'] - graphs_before
+            if compiled_graphs <= 0:
+                # 没有生成任何编译图，说明推理没有经过编译后的模块
+                backend.model = original_module
+                self.logger.warning("torch.compile 未生效，使用未编译的模型")
+                return
+            self.logger.info(f"模型编译完成，生成 {compiled_graphs} 个编译图")
+        except Exception as e:
+            backend.model = original_module
+            self.logger.warning(f"模型编译失败，使用未编译的模型: {e}")
+
+    def _run_batch(self, images: List[np.ndarray], confidence_threshold: float,
+                   imgsz: Tuple[int, int]) -> List[Any]:
+        """同步执行一次批量推理，按输入顺序返回每张图像的 Results"""
+        source = images[0] if len(images) == 1 else images
+        # 关闭 autograd 记录，结果中的张量不再携带计算图
+        with torch.inference_mode():
+            return self.model(source, conf=confidence_threshold, device=self.device, imgsz=imgsz,
+                              half=self._half, verbose=False)
+
+    async def predict_batch(self, images_or_urls: List[Union[np.ndarray, str]], confidence_threshold: float = 0.5,
+                            target_size: Tuple[int, int] = (96, 96)) -> List[List[Dict[str, float]]]:
+        """
+        异步批量预测，图像并发提交后由调度器合并为批次推理
+
+        Args:
+            images_or_urls: OpenCV格式的图像数组或图像URL列表
+            confidence_threshold: 置信度阈值
+            target_size: 目标图像尺寸 (width, height)，默认为(96, 96)
+
+        Returns:
+            List[List[Dict]]: 与输入顺序一致的每张图像的检测结果
+        """
+        return list(await asyncio.gather(*(
+            self.predict_from_url(item, confidence_threshold, target_size) if isinstance(item, str)
+            else self.predict_image(item, confidence_threshold, target_size)
+            for item in images_or_urls
+        )))
+
     async def predict_coordinates(self, image_path: str, confidence_threshold: float = 0.5,
                                   target_size: Tuple[int, int] = (96, 96)) -> List[Tuple[float, float]]:
         """
@@ -290,8 +637,44 @@ class AsyncCaptchaBreaker:
         detections = await self.predict(image_path, confidence_threshold, target_size)
         return [(det['center_x'], det['center_y']) for det in detections]
 
+    @staticmethod
+    def _draw_detections(image: np.ndarray, detections: List[Dict[str, float]]) -> np.ndarray:
+        """
+        在图像副本上绘制检测框、中心点和置信度
+
+        Args:
+            image: OpenCV格式的图像数组
+            detections: 检测结果
+
+        Returns:
+            np.ndarray: 标注后的图像
+        """
+        annotated_image = image.copy()
+        if not detections:
+            return annotated_image
+
+        boxes = np.array([[det['x1'], det['y1'], det['x2'], det['y2']] for det in detections]).astype(np.int32)
+        centers = np.array([[det['center_x'], det['center_y']] for det in detections]).astype(np.int32)
+
+        # 所有边界框一次绘制：每个框转为四个顶点的闭合折线
+        x1, y1, x2, y2 = boxes.T
+        polygons = np.stack([
+            np.stack([x1, y1], axis=1), np.stack([x2, y1], axis=1),
+            np.stack([x2, y2], axis=1), np.stack([x1, y2], axis=1)
+        ], axis=1).reshape(-1, 4, 1, 2)
+        cv2.polylines(annotated_image, list(polygons), True, (0, 255, 0), 2)
+
+        # 绘制中心点和置信度标签
+        for (center_x, center_y), (label_x, label_y), det in zip(centers.tolist(), boxes[:, :2].tolist(), detections):
+            cv2.circle(annotated_image, (center_x, center_y), 5, (0, 0, 255), -1)
+            cv2.putText(annotated_image, f"Conf: {det['confidence']:.2f}", (label_x, label_y - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 0), 2)
+
+        return annotated_image
+
     async def predict_with_image(self, image_path: str, confidence_threshold: float = 0.5,
-                                 save_path: Optional[str] = None, target_size: Tuple[int, int] = (96, 96)) -> Dict:
+                                 save_path: Optional[str] = None, target_size: Tuple[int, int] = (96, 96),
+                                 annotate: bool = True) -> Dict:
         """
         异步预测并返回带标注的图像
         
@@ -300,6 +683,7 @@ class AsyncCaptchaBreaker:
             confidence_threshold: 置信度阈值
             save_path: 保存标注图像的可选路径
             target_size: 目标图像尺寸 (width, height)，默认为(96, 96)
+            annotate: 是否返回标注图像，为False且不保存时 annotated_image 为None
             
         Returns:
             Dict: 包含检测结果和标注图像的信息
@@ -308,31 +692,16 @@ class AsyncCaptchaBreaker:
 
         # 异步读取原始图像
         loop = asyncio.get_event_loop()
-        image = await loop.run_in_executor(None, cv2.imread, image_path)
+        image = await loop.run_in_executor(self._io_pool, cv2.imread, image_path)
         if image is None:
             raise ValueError(f"无法读取图像: {image_path}")
 
-        # 在图像上绘制检测结果
-        annotated_image = image.copy()
-
-        for det in detections:
-            x1, y1, x2, y2 = int(det['x1']), int(det['y1']), int(det['x2']), int(det['y2'])
-            center_x, center_y = int(det['center_x']), int(det['center_y'])
-
-            # 绘制边界框
-            cv2.rectangle(annotated_image, (x1, y1), (x2, y2), (0, 255, 0), 2)
-
-            # 绘制中心点
-            cv2.circle(annotated_image, (center_x, center_y), 5, (0, 0, 255), -1)
-
-            # 添加置信度标签
-            label = f"Conf: {det['confidence']:.2f}"
-            cv2.putText(annotated_image, label, (x1, y1 - 10),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 0), 2)
+        # 在图像上绘制检测结果，既不返回也不保存时跳过绘制
+        annotated_image = self._draw_detections(image, detections) if annotate or save_path else None
 
         # 异步保存标注图像
         if save_path:
-            await loop.run_in_executor(None, cv2.imwrite, save_path, annotated_image)
+            await loop.run_in_executor(self._io_pool, cv2.imwrite, save_path, annotated_image)
 
         return {
             'detections': detections,
@@ -357,28 +726,16 @@ class AsyncCaptchaBreaker:
             raise RuntimeError("模型未加载")
 
         try:
-            # 异步下载图像
-            cv_image = await self._download_image_from_url(url)
+            # 异步下载图像，缓存命中时无需解码和推理
+            image_data = await self._fetch_image_bytes(url)
+            detections = await self._predict_bytes(image_data, url, confidence_threshold, target_size)
 
-            # 异步保存为临时文件
-            temp_path = await self._save_temp_image(cv_image)
+            # 添加图像尺寸信息到每个检测结果
+            for det in detections:
+                det['image_width'] = det['original_width']
+                det['image_height'] = det['original_height']
 
-            try:
-                # 使用临时文件进行预测
-                detections = await self.predict(temp_path, confidence_threshold, target_size)
-
-                # 添加图像尺寸信息到每个检测结果
-                height, width = cv_image.shape[:2]
-                for det in detections:
-                    det['image_width'] = width
-                    det['image_height'] = height
-
-                return detections
-
-            finally:
-                # 异步清理临时文件
-                loop = asyncio.get_event_loop()
-                await loop.run_in_executor(None, lambda: Path(temp_path).unlink(missing_ok=True))
+            return detections
 
         except Exception as e:
             raise RuntimeError(f"URL预测失败: {str(e)}")
@@ -401,7 +758,8 @@ class AsyncCaptchaBreaker:
 
     async def predict_with_image_from_url(self, url: str, confidence_threshold: float = 0.5,
                                           save_path: Optional[str] = None,
-                                          target_size: Tuple[int, int] = (96, 96)) -> Dict:
+                                          target_size: Tuple[int, int] = (96, 96),
+                                          annotate: bool = True) -> Dict:
         """
         异步从URL下载验证码图像，预测并返回带标注的图像
         
@@ -410,6 +768,7 @@ class AsyncCaptchaBreaker:
             confidence_threshold: 置信度阈值
             save_path: 保存标注图像的可选路径
             target_size: 目标图像尺寸 (width, height)，默认为(96, 96)
+            annotate: 是否返回标注图像，为False且不保存时 annotated_image 为None
             
         Returns:
             Dict: 包含检测结果和标注图像的信息
@@ -421,50 +780,26 @@ class AsyncCaptchaBreaker:
             # 异步下载图像
             cv_image = await self._download_image_from_url(url)
 
-            # 异步保存为临时文件
-            temp_path = await self._save_temp_image(cv_image)
+            # 直接使用内存中的图像进行预测
+            detections = await self.predict_image(cv_image, confidence_threshold, target_size)
 
-            try:
-                # 使用临时文件进行预测
-                detections = await self.predict(temp_path, confidence_threshold, target_size)
-
-                # 在图像上绘制检测结果
-                annotated_image = cv_image.copy()
-
-                for det in detections:
-                    x1, y1, x2, y2 = int(det['x1']), int(det['y1']), int(det['x2']), int(det['y2'])
-                    center_x, center_y = int(det['center_x']), int(det['center_y'])
-
-                    # 绘制边界框
-                    cv2.rectangle(annotated_image, (x1, y1), (x2, y2), (0, 255, 0), 2)
-
-                    # 绘制中心点
-                    cv2.circle(annotated_image, (center_x, center_y), 5, (0, 0, 255), -1)
+            # 在图像上绘制检测结果，既不返回也不保存时跳过绘制
+            annotated_image = self._draw_detections(cv_image, detections) if annotate or save_path else None
 
-                    # 添加置信度标签
-                    label = f"Conf: {det['confidence']:.2f}"
-                    cv2.putText(annotated_image, label, (x1, y1 - 10),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 0), 2)
-
-                # 异步保存标注图像
-                if save_path:
-                    loop = asyncio.get_event_loop()
-                    await loop.run_in_executor(None, cv2.imwrite, save_path, annotated_image)
-
-                # 添加图像尺寸信息
-                height, width = cv_image.shape[:2]
+            # 异步保存标注图像
+            if save_path:
+                loop = asyncio.get_event_loop()
+                await loop.run_in_executor(self._io_pool, cv2.imwrite, save_path, annotated_image)
 
-                return {
-                    'detections': detections,
-                    'annotated_image': annotated_image,
-                    'image_shape': (height, width),
-                    'original_url': url
-                }
+            # 添加图像尺寸信息
+            height, width = cv_image.shape[:2]
 
-            finally:
-                # 异步清理临时文件
-                loop = asyncio.get_event_loop()
-                await loop.run_in_executor(None, lambda: Path(temp_path).unlink(missing_ok=True))
+            return {
+                'detections': detections,
+                'annotated_image': annotated_image,
+                'image_shape': (height, width),
+                'original_url': url
+            }
 
         except Exception as e:
             raise RuntimeError(f"URL图像标注预测失败: {str(e)}")
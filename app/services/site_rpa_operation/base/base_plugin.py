@@ -1,7 +1,7 @@
 import abc
 from abc import ABC
-from dataclasses import dataclass
-from typing import Optional, Callable, Any
+from dataclasses import dataclass, field
+from typing import Callable, ClassVar, Sequence
 from enum import StrEnum
 
 import loguru
@@ -19,47 +19,60 @@ class PluginMethodType(StrEnum):
     ON_SUCCESS = "on_success"
 
 
-class OperationNode:
-    """操作节点，表示插件中的一个操作"""
-    def __init__(self, operation: Callable, name: str = ""):
-        self.operation = operation
-        self.name = name
-        self.next_operation: Optional['OperationNode'] = None
-
-
-@dataclass
+@dataclass(slots=True)
 class BasePlugin(ABC):
     base_playwright_engine: BaseUndetectedPlaywright
     session: BrowserContext
     logger: "loguru.Logger"
+    # 不随实例变化的操作在类上声明：(方法类型, 方法名, 说明)，实例化时按顺序加入操作链
+    _OPERATIONS: ClassVar[tuple[tuple[PluginMethodType, str, str], ...]] = ()
     
-    # 每个生命周期方法的操作链头节点
-    before_exec_chain: Optional[OperationNode] = None
-    after_exec_chain: Optional[OperationNode] = None
-    on_exec_chain: Optional[OperationNode] = None
-    on_error_chain: Optional[OperationNode] = None
-    on_success_chain: Optional[OperationNode] = None
+    # 每个生命周期方法的操作链，按添加顺序执行；freeze 之后转为 tuple
+    before_exec_chain: Sequence[Callable] = field(default_factory=list)
+    after_exec_chain: Sequence[Callable] = field(default_factory=list)
+    on_exec_chain: Sequence[Callable] = field(default_factory=list)
+    on_error_chain: Sequence[Callable] = field(default_factory=list)
+    on_success_chain: Sequence[Callable] = field(default_factory=list)
+    # 以下在 __post_init__ 中初始化，声明为字段以便生成 __slots__
+    _chains: dict = field(init=False, repr=False)
+    _frozen: bool = field(init=False, repr=False)
+
+    def __post_init__(self):
+        # 预先建立方法类型到操作链的映射，避免每次按字符串 getattr
+        self._chains: dict[PluginMethodType, list[Callable]] = {
+            PluginMethodType.BEFORE_EXEC: self.before_exec_chain,
+            PluginMethodType.AFTER_EXEC: self.after_exec_chain,
+            PluginMethodType.ON_EXEC: self.on_exec_chain,
+            PluginMethodType.ON_ERROR: self.on_error_chain,
+            PluginMethodType.ON_SUCCESS: self.on_success_chain,
+        }
+        self._frozen = False
+        for method_name, operation_name, name in type(self)._OPERATIONS:
+            self.add_operation(method_name, getattr(self, operation_name), name)
     
     def add_operation(self, method_name: PluginMethodType, operation: Callable, name: str = ""):
-        """向指定生命周期方法添加操作"""
-        new_node = OperationNode(operation, name)
-        chain_head = getattr(self, f"{method_name}_chain")
-        
-        if chain_head is None:
-            setattr(self, f"{method_name}_chain", new_node)
-        else:
-            current = chain_head
-            while current.next_operation:
-                current = current.next_operation
-            current.next_operation = new_node
+        """向指定生命周期方法添加操作，name 仅用于说明操作用途"""
+        if self._frozen:
+            raise RuntimeError(f"插件 {self.__class__.__name__} 的操作链已冻结，无法再添加操作")
+        if callable(operation):
+            self._chains[method_name].append(operation)
+
+    def freeze(self):
+        """插件注册完成后调用，操作链不再变化，转为 tuple 存储"""
+        if self._frozen:
+            return
+        self.before_exec_chain = tuple(self.before_exec_chain)
+        self.after_exec_chain = tuple(self.after_exec_chain)
+        self.on_exec_chain = tuple(self.on_exec_chain)
+        self.on_error_chain = tuple(self.on_error_chain)
+        self.on_success_chain = tuple(self.on_success_chain)
+        self._frozen = True
     
-    async def execute_operation_chain(self, chain_head: Optional[OperationNode], *args, **kwargs):
+    @staticmethod
+    async def execute_operation_chain(chain: Sequence[Callable], *args, **kwargs):
         """执行操作链"""
-        current = chain_head
-        while current:
-            if callable(current.operation):
-                await current.operation(*args, **kwargs)
-            current = current.next_operation
+        for operation in chain:
+            await operation(*args, **kwargs)
     
     async def before_exec(self):
         """执行before_exec操作链"""
@@ -79,4 +92,4 @@ class BasePlugin(ABC):
 
     async def on_success(self):
         """执行on_success操作链"""
-        await self.execute_operation_chain(self.on_success_chain)
\ No newline at end of file
+        await self.execute_operation_chain(self.on_success_chain)
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+import weakref
 from functools import wraps
 import loguru
 from patchright.async_api import BrowserContext, Page
@@ -7,6 +8,65 @@ from app.services.site_rpa_operation.base.base_plugin import BasePlugin, PluginM
 from app.utils.decorator import log_class_decorator
 from typing import Type
 
+# 需要增强的页面方法
+PAGE_METHODS_TO_ENHANCE = frozenset({
+    'click', 'fill', 'type', 'press', 'check', 'uncheck', 'select_option',
+    'set_input_files', 'focus', 'blur', 'drag_and_drop', 'hover',
+    'goto', 'reload', 'wait_for_selector', 'wait_for_function',
+    'evaluate', 'evaluate_handle', 'query_selector', 'query_selector_all'
+})
+
+
+class _LazyEnhancedMethod:
+    """
+    非数据描述符，页面方法第一次被访问时才包装插件逻辑，并缓存到实例的 __dict__ 中，
+    之后的访问直接命中实例属性，不再经过描述符
+    """
+
+    def __init__(self, method_name: str):
+        self.method_name = method_name
+
+    def __get__(self, page, owner):
+        if page is None:
+            return self
+        original_method = getattr(super(owner, page), self.method_name)
+        manager = page.__dict__.get('_plugin_manager')
+        if manager is None:
+            return original_method
+        enhanced_method = manager._wrap_page_method(original_method)
+        page.__dict__[self.method_name] = enhanced_method
+        return enhanced_method
+
+
+# 页面类 -> 带延迟增强方法的子类，每种页面类只生成一次
+_pluginized_page_classes: dict[type, type] = {}
+
+
+def _get_pluginized_page_class(page_class: type) -> type:
+    if page_class in _pluginized_page_classes.values():
+        return page_class
+    pluginized_class = _pluginized_page_classes.get(page_class)
+    if pluginized_class is None:
+        pluginized_class = type(
+            f'Pluginized{page_class.__name__}',
+            (page_class,),
+            {
+                method_name: _LazyEnhancedMethod(method_name)
+                for method_name in PAGE_METHODS_TO_ENHANCE
+                if callable(getattr(page_class, method_name, None))
+            }
+        )
+        _pluginized_page_classes[page_class] = pluginized_class
+    return pluginized_class
+
+
+def get_original_page_method(page: Page, method_name: str):
+    """获取页面未经插件包装的方法，插件自身操作页面时使用，不会再次触发插件钩子"""
+    page_class = type(page)
+    if page_class in _pluginized_page_classes.values():
+        return getattr(super(page_class, page), method_name)
+    return getattr(page, method_name)
+
 
 @dataclass
 @log_class_decorator.decorator
@@ -16,7 +76,8 @@ class PluginizedPageManager:
     logger: "loguru.Logger" = None
     plugins: list[Type[BasePlugin]] = None  # 放没有实例化的类进去，运行时实例化
     plugin_instances: list[BasePlugin] = None  # 插件实例列表
-    _enhanced_pages: set = None  # 存储已增强的页面对象
+    _enhanced_pages: weakref.WeakSet = None  # 存储已增强的页面对象，页面被回收后自动移除
+    _hooks: dict = None  # 方法类型 -> [(插件类名, 绑定的钩子方法)]，注册插件时预先生成
 
     def reg_plugins(self):
         """注册插件"""
@@ -31,21 +92,32 @@ class PluginizedPageManager:
                 session=self.session,
                 logger=self.logger
             )
+            plugin.freeze()
             self.plugin_instances.append(plugin)
 
+        # 预先取出每个插件的钩子方法，执行时无需逐个 getattr
+        self._hooks = {
+            method_type: [
+                (plugin.__class__.__name__, hook)
+                for plugin in self.plugin_instances
+                if (hook := getattr(plugin, method_type, None))
+            ]
+            for method_type in PluginMethodType
+        }
+
         # 初始化已增强页面集合
-        self._enhanced_pages = set()
+        self._enhanced_pages = weakref.WeakSet()
 
     async def __execute_plugins(self, method_name: PluginMethodType, *args, **kwargs):
         """执行所有插件的指定方法"""
-        if self.plugin_instances:
-            for plugin in self.plugin_instances:
-                method = getattr(plugin, method_name, None)
-                if method:
-                    try:
-                        await method(*args, **kwargs)
-                    except Exception as e:
-                        self.logger.error(f"插件 {plugin.__class__.__name__} 执行 {method_name} 时出错: {e}")
+        if not self._hooks:
+            return
+        error = self.logger.error
+        for plugin_name, hook in self._hooks[method_name]:
+            try:
+                await hook(*args, **kwargs)
+            except Exception as e:
+                error(f"插件 {plugin_name} 执行 {method_name} 时出错: {e}")
 
     async def __execute_with_plugins(self, operation_func, *args, **kwargs):
         """使用插件执行操作"""
@@ -72,9 +144,8 @@ class PluginizedPageManager:
             # 执行 after_exec 钩子
             await self.__execute_plugins(PluginMethodType.AFTER_EXEC)
 
-    def __enhance_page_method(self, page: Page, method_name: str) -> None:
-        """增强页面对象的指定方法"""
-        original_method = getattr(page, method_name)
+    def _wrap_page_method(self, original_method):
+        """用插件逻辑包装页面方法"""
 
         @wraps(original_method)
         async def enhanced_method(*args, **kwargs):
@@ -85,37 +156,41 @@ class PluginizedPageManager:
             # 使用插件执行操作
             return await self.__execute_with_plugins(operation)
 
-        # 替换原始方法
-        setattr(page, method_name, enhanced_method)
+        return enhanced_method
 
     def __inject_plugins_to_page(self, page: Page) -> Page:
         """将插件注入到页面对象中，增强其方法"""
-        if not self.plugin_instances or id(page) in self._enhanced_pages:
+        if not self.plugin_instances or page in self._enhanced_pages:
             return page
 
-        # 需要增强的页面方法列表
-        page_methods_to_enhance = [
-            'click', 'fill', 'type', 'press', 'check', 'uncheck', 'select_option',
-            'set_input_files', 'focus', 'blur', 'drag_and_drop', 'hover',
-            'goto', 'reload', 'wait_for_selector', 'wait_for_function',
-            'evaluate', 'evaluate_handle', 'query_selector', 'query_selector_all'
-        ]
-
-        for method_name in page_methods_to_enhance:
-            if hasattr(page, method_name) and callable(getattr(page, method_name)):
-                self.__enhance_page_method(page, method_name)
+        # 只替换页面的类，方法在第一次被访问时才包装
+        page.__dict__['_plugin_manager'] = self
+        page.__class__ = _get_pluginized_page_class(type(page))
 
         # 标记页面已增强
-        self._enhanced_pages.add(id(page))
+        self._enhanced_pages.add(page)
         self.logger.debug(f"已为页面 {id(page)} 注入插件功能")
 
         return page
 
     async def __new_page(self) -> Page:
-        """创建新页面并自动注入插件"""
-        page = await self.session.new_page()
+        """创建新页面并自动注入插件，插件提供页面池时优先从池中获取"""
+        acquire_page = next(
+            (plugin.acquire_page for plugin in self.plugin_instances or () if hasattr(plugin, 'acquire_page')),
+            None
+        )
+        page = await acquire_page() if acquire_page else await self.session.new_page()
         return self.__inject_plugins_to_page(page)
 
+    async def release_page(self, page: Page) -> None:
+        """归还通过 __new_page 获取的页面，插件提供页面池时交由插件回收"""
+        release_page = next(
+            (plugin.release_page for plugin in self.plugin_instances or () if hasattr(plugin, 'release_page')),
+            None
+        )
+        if release_page:
+            await release_page(page)
+
     async def get_current_page(self) -> Page:
         """获取当前活动页面并确保已注入插件"""
         # BrowserContext有pages属性，返回所有页面列表
@@ -11,26 +11,45 @@ class LogPlugin(BasePlugin):
         # 向各个生命周期方法添加日志操作
         self._setup_log_operations()
 
+    def _level_enabled(self, level: str) -> bool:
+        """判断 logger 当前是否有 sink 会输出该级别的日志"""
+        try:
+            return self.logger._core.min_level <= self.logger.level(level).no
+        except (AttributeError, ValueError):
+            # 非 loguru logger 时无法判断，按启用处理
+            return True
+
     def _setup_log_operations(self):
-        """设置日志操作链"""
+        """设置日志操作链，只注册当前日志级别下会产生输出的操作，避免每次页面操作都空跑协程"""
+        info_enabled = self._level_enabled("INFO")
+        debug_enabled = self._level_enabled("DEBUG")
+
         # before_exec 操作链
-        self.add_operation(PluginMethodType.BEFORE_EXEC, self._log_start_operation, "记录操作开始")
-        self.add_operation(PluginMethodType.BEFORE_EXEC, self._log_operation_context, "记录操作上下文")
+        if info_enabled:
+            self.add_operation(PluginMethodType.BEFORE_EXEC, self._log_start_operation, "记录操作开始")
+        if debug_enabled:
+            self.add_operation(PluginMethodType.BEFORE_EXEC, self._log_operation_context, "记录操作上下文")
 
         # after_exec 操作链  
-        self.add_operation(PluginMethodType.AFTER_EXEC, self._log_operation_complete, "记录操作完成")
-        self.add_operation(PluginMethodType.AFTER_EXEC, self._log_execution_time, "记录执行时间")
+        if info_enabled:
+            self.add_operation(PluginMethodType.AFTER_EXEC, self._log_operation_complete, "记录操作完成")
+        if debug_enabled:
+            self.add_operation(PluginMethodType.AFTER_EXEC, self._log_execution_time, "记录执行时间")
 
         # on_exec 操作链
-        self.add_operation(PluginMethodType.ON_EXEC, self._log_operation_progress, "记录操作进度")
+        if debug_enabled:
+            self.add_operation(PluginMethodType.ON_EXEC, self._log_operation_progress, "记录操作进度")
 
         # on_error 操作链
         self.add_operation(PluginMethodType.ON_ERROR, self._log_error_details, "记录错误详情")
-        self.add_operation(PluginMethodType.ON_ERROR, self._log_error_context, "记录错误上下文")
+        if debug_enabled:
+            self.add_operation(PluginMethodType.ON_ERROR, self._log_error_context, "记录错误上下文")
 
         # on_success 操作链
-        self.add_operation(PluginMethodType.ON_SUCCESS, self._log_success_details, "记录成功详情")
-        self.add_operation(PluginMethodType.ON_SUCCESS, self._log_result_summary, "记录结果摘要")
+        if info_enabled:
+            self.add_operation(PluginMethodType.ON_SUCCESS, self._log_success_details, "记录成功详情")
+        if debug_enabled:
+            self.add_operation(PluginMethodType.ON_SUCCESS, self._log_result_summary, "记录结果摘要")
 
     async def _log_start_operation(self):
         """记录操作开始"""
@@ -38,8 +57,12 @@ class LogPlugin(BasePlugin):
 
     async def _log_operation_context(self):
         """记录操作上下文"""
-        self.logger.debug(f"[LOG PLUGIN] 📋 操作上下文 - 浏览器引擎: {type(self.base_playwright_engine).__name__}")
-        self.logger.debug(f"[LOG PLUGIN] 📋 操作上下文 - 会话状态: {'已连接' if self.session else '未连接'}")
+        self.logger.opt(lazy=True).debug(
+            "[LOG PLUGIN] 📋 操作上下文 - 浏览器引擎: {}", lambda: type(self.base_playwright_engine).__name__
+        )
+        self.logger.opt(lazy=True).debug(
+            "[LOG PLUGIN] 📋 操作上下文 - 会话状态: {}", lambda: '已连接' if self.session else '未连接'
+        )
 
     async def _log_operation_complete(self):
         """记录操作完成"""
@@ -65,7 +88,7 @@ class LogPlugin(BasePlugin):
         """记录错误上下文"""
         self.logger.debug(f"[LOG PLUGIN] 🔍 错误上下文 - 重试次数: 待实现")
         if error:
-            self.logger.debug(f"[LOG PLUGIN] 🔍 错误类型: {type(error).__name__}")
+            self.logger.opt(lazy=True).debug("[LOG PLUGIN] 🔍 错误类型: {}", lambda: type(error).__name__)
 
     async def _log_success_details(self):
         """记录成功详情"""
@@ -1,41 +1,125 @@
 """
 页面数量限制插件 - 限制浏览器中最大页面数量
 """
+import asyncio
+from collections import deque
+
 from app.services.site_rpa_operation.base.base_plugin import BasePlugin, PluginMethodType
+from app.services.site_rpa_operation.base.plugined_page_manager import get_original_page_method
+
+# 关闭单个页面的超时时间（秒），渲染进程卡死时 close 可能永远不返回
+CLOSE_TIMEOUT = 5.0
 
 
 class PageLimitPlugin(BasePlugin):
     """页面数量限制插件 - 限制浏览器中最大页面数量"""
+    __slots__ = ('max_pages', 'reuse_pages', 'current_pages', '_free_pages', '_checked_out')
+    _OPERATIONS = (
+        (PluginMethodType.BEFORE_EXEC, '_check_page_limit', "检查页面数量限制"),
+        (PluginMethodType.ON_ERROR, '_handle_page_error', "处理页面错误"),
+    )
     
-    def __init__(self, max_pages: int = 5, **kwargs):
+    def __init__(self, max_pages: int = 5, reuse_pages: bool = False, **kwargs):
+        """
+        Args:
+            max_pages: 最大页面数量
+            reuse_pages: 通过 release_page 归还的页面导航到空白页后放入空闲池，供 acquire_page 复用
+        """
         super().__init__(**kwargs)
         self.max_pages = max_pages
+        self.reuse_pages = reuse_pages
         self.current_pages = 0
-        
-        # 添加操作到操作链
-        self.add_operation(PluginMethodType.BEFORE_EXEC, self._check_page_limit, "检查页面数量限制")
-        self.add_operation(PluginMethodType.ON_SUCCESS, self._update_page_count, "更新页面计数")
-        self.add_operation(PluginMethodType.ON_ERROR, self._handle_page_error, "处理页面错误")
+        # 空闲页面池，仍计入 current_pages，但不计入活跃页面数
+        self._free_pages: deque = deque()
+        # 开启 reuse_pages 时通过 acquire_page 借出、尚未归还的页面，只有这些页面可以放入空闲池
+        self._checked_out: set = set()
+        pages = self._get_pages()
+        if pages is not None:
+            # 通过页面打开/关闭事件增量维护页面计数，钩子中无需再遍历 pages
+            for page in pages:
+                self._on_page_open(page)
+            self.session.on("page", self._on_page_open)
+
+    def _on_page_open(self, page):
+        """页面打开事件"""
+        self.current_pages += 1
+        page.on("close", self._on_page_close)
+
+    def _on_page_close(self, page):
+        """页面关闭事件"""
+        self.current_pages = max(0, self.current_pages - 1)
+        if page in self._free_pages:
+            self._free_pages.remove(page)
+        self._checked_out.discard(page)
+
+    @property
+    def active_pages(self) -> int:
+        """正在使用的页面数量（不含空闲池中的页面）"""
+        return self.current_pages - len(self._free_pages)
+
+    async def acquire_page(self):
+        """获取页面，优先复用空闲池中的页面，否则新建；用完后调用 release_page 归还"""
+        page = None
+        while self._free_pages:
+            candidate = self._free_pages.popleft()
+            if not candidate.is_closed():
+                page = candidate
+                break
+        if page is None:
+            page = await self.session.new_page()
+        if self.reuse_pages:
+            self._checked_out.add(page)
+        return page
+
+    async def release_page(self, page):
+        """归还 acquire_page 借出的页面，开启 reuse_pages 且空闲池未满时放入空闲池，否则关闭"""
+        if page not in self._checked_out:
+            # 不是借出的页面或已经归还过，避免同一页面进入空闲池两次
+            return
+        self._checked_out.discard(page)
+        if page.is_closed():
+            return
+        if self.reuse_pages and len(self._free_pages) < self.max_pages:
+            try:
+                # 使用未经插件包装的 goto，回收页面不触发钩子，也不影响其他页面并发操作时的数量检查
+                await get_original_page_method(page, 'goto')("about:blank")
+            except Exception as e:
+                self.logger.error(f"[PAGE LIMIT] 回收页面失败: {e}")
+            else:
+                self._free_pages.append(page)
+                return
+        try:
+            await asyncio.wait_for(page.close(), timeout=CLOSE_TIMEOUT)
+        except Exception as e:
+            self.logger.error(f"[PAGE LIMIT] 关闭归还页面失败: {e}")
+
+    def _get_pages(self) -> list | None:
+        """获取当前页面列表快照，session 没有 pages 属性时返回 None；context.pages 每次访问都会新建列表，调用方应复用返回值"""
+        try:
+            return self.session.pages
+        except AttributeError:
+            return None
     
     async def _check_page_limit(self):
-        """检查页面数量是否超过限制"""
-        # 获取当前页面数量
-        if hasattr(self.session, 'pages'):
-            self.current_pages = len(self.session.pages)
-        else:
-            self.current_pages = 0
-        
-        self.logger.debug(f"[PAGE LIMIT] 当前页面数量: {self.current_pages}/{self.max_pages}")
+        """检查页面数量是否超过限制，页面数量由事件维护"""
+        # 每次操作前都会执行，lazy 模式下 DEBUG 未开启时不格式化消息
+        self.logger.opt(lazy=True).debug(
+            "[PAGE LIMIT] 当前页面数量: {}/{}", lambda: self.active_pages, lambda: self.max_pages
+        )
         
         # 如果页面数量超过限制，关闭最旧的页面
-        if self.current_pages >= self.max_pages:
+        if self.active_pages >= self.max_pages:
             await self._close_oldest_page()
     
-    async def _close_oldest_page(self):
+    async def _close_oldest_page(self, pages: list | None = None):
         """关闭最旧的页面"""
-        if hasattr(self.session, 'pages') and len(self.session.pages) > 0:
+        if pages is None:
+            pages = self._get_pages() or []
+        # 借出中的页面正在被使用，不能关闭
+        pages = [page for page in pages if page not in self._checked_out]
+        if len(pages) > 0:
             # 第一个页面通常是最旧的
-            oldest_page = self.session.pages[0]
+            oldest_page = pages[0]
             
             # 检查页面是否已经关闭
             if not oldest_page.is_closed():
@@ -44,29 +128,37 @@ class PageLimitPlugin(BasePlugin):
                 )
                 
                 try:
-                    await oldest_page.close()
+                    await asyncio.wait_for(oldest_page.close(), timeout=CLOSE_TIMEOUT)
                     self.logger.info("[PAGE LIMIT] 最旧页面已关闭")
                 except Exception as e:
-                    self.logger.error(f"[PAGE LIMIT] 关闭页面失败: {e}")
+                    if isinstance(e, asyncio.TimeoutError):
+                        self.logger.warning(f"[PAGE LIMIT] 关闭页面超时({CLOSE_TIMEOUT}秒)")
+                    else:
+                        self.logger.error(f"[PAGE LIMIT] 关闭页面失败: {e}")
                     
                     # 如果关闭失败，尝试关闭下一个页面
-                    if len(self.session.pages) > 1:
-                        next_oldest = self.session.pages[1]
+                    if len(pages) > 1:
+                        next_oldest = pages[1]
                         if not next_oldest.is_closed():
                             try:
-                                await next_oldest.close()
+                                await asyncio.wait_for(next_oldest.close(), timeout=CLOSE_TIMEOUT)
                                 self.logger.info("[PAGE LIMIT] 备用页面已关闭")
+                            except asyncio.TimeoutError:
+                                self.logger.warning(f"[PAGE LIMIT] 备用页面关闭超时({CLOSE_TIMEOUT}秒)")
                             except Exception as e2:
                                 self.logger.error(f"[PAGE LIMIT] 备用页面关闭也失败: {e2}")
     
     async def _update_page_count(self):
-        """更新页面计数"""
+        """按实际页面列表校正计数，仅在出错和强制清理后调用"""
         # 重新计算当前页面数量
-        if hasattr(self.session, 'pages'):
-            new_count = len(self.session.pages)
+        pages = self._get_pages()
+        if pages is not None:
+            new_count = len(pages)
             if new_count != self.current_pages:
                 self.current_pages = new_count
-                self.logger.debug(f"[PAGE LIMIT] 页面数量更新为: {self.current_pages}/{self.max_pages}")
+                self.logger.opt(lazy=True).debug(
+                    "[PAGE LIMIT] 页面数量更新为: {}/{}", lambda: self.current_pages, lambda: self.max_pages
+                )
     
     async def _handle_page_error(self, error):
         """处理页面相关错误"""
@@ -83,39 +175,55 @@ class PageLimitPlugin(BasePlugin):
         }
         
         # 添加每个页面的详细信息
-        if hasattr(self.session, 'pages'):
+        pages = self._get_pages()
+        if pages is not None:
+            closed_flags = [page.is_closed() for page in pages]
+            open_pages = [page for page, is_closed in zip(pages, closed_flags) if not is_closed]
+            # 所有未关闭页面的标题并发获取，只需一次往返等待
+            titles = iter(await asyncio.gather(*(page.title() for page in open_pages), return_exceptions=True))
             stats['pages_info'] = []
-            for i, page in enumerate(self.session.pages):
+            for i, (page, is_closed) in enumerate(zip(pages, closed_flags)):
+                if is_closed:
+                    url = title = 'CLOSED'
+                else:
+                    url = page.url
+                    title = next(titles)
+                    if isinstance(title, Exception):
+                        title = 'ERR'
                 stats['pages_info'].append({
                     'index': i,
-                    'url': page.url if not page.is_closed() else 'CLOSED',
-                    'title': page.title() if not page.is_closed() else 'CLOSED',
-                    'is_closed': page.is_closed()
+                    'url': url,
+                    'title': title,
+                    'is_closed': is_closed
                 })
         
         return stats
     
     async def force_cleanup(self):
         """强制清理超出限制的页面"""
-        if hasattr(self.session, 'pages'):
-            current_count = len(self.session.pages)
-            if current_count > self.max_pages:
-                self.logger.warning(
-                    f"[PAGE LIMIT] 强制清理: {current_count} > {self.max_pages}"
-                )
-                
-                # 关闭超出限制的页面（从最旧的开始）
-                pages_to_close = current_count - self.max_pages
-                closed_count = 0
-                
-                for i in range(min(pages_to_close, len(self.session.pages))):
-                    page = self.session.pages[i]
-                    if not page.is_closed():
-                        try:
-                            await page.close()
-                            closed_count += 1
-                        except Exception as e:
-                            self.logger.error(f"[PAGE LIMIT] 强制关闭页面失败: {e}")
-                
-                self.logger.info(f"[PAGE LIMIT] 强制清理完成，关闭了 {closed_count} 个页面")
-                await self._update_page_count()
\ No newline at end of file
+        pages = self._get_pages() or []
+        current_count = len(pages)
+        if current_count > self.max_pages:
+            self.logger.warning(
+                f"[PAGE LIMIT] 强制清理: {current_count} > {self.max_pages}"
+            )
+            
+            # 关闭超出限制的页面（从最旧的开始）
+            pages_to_close = current_count - self.max_pages
+            targets = [page for page in pages[:pages_to_close] if not page.is_closed()]
+            # 并发关闭，多个 close 请求在同一连接上流水线发送
+            results = await asyncio.gather(
+                *(asyncio.wait_for(page.close(), timeout=CLOSE_TIMEOUT) for page in targets),
+                return_exceptions=True
+            )
+            closed_count = 0
+            for result in results:
+                if isinstance(result, asyncio.TimeoutError):
+                    self.logger.warning(f"[PAGE LIMIT] 强制关闭页面超时({CLOSE_TIMEOUT}秒)")
+                elif isinstance(result, Exception):
+                    self.logger.error(f"[PAGE LIMIT] 强制关闭页面失败: {result}")
+                else:
+                    closed_count += 1
+            
+            self.logger.info(f"[PAGE LIMIT] 强制清理完成，关闭了 {closed_count} 个页面")
+            await self._update_page_count()
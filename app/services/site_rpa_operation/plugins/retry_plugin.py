@@ -1,61 +1,84 @@
+from app.config import settings
 from app.services.site_rpa_operation.base.base_plugin import BasePlugin, PluginMethodType
 import asyncio
+import random
+import warnings
 
 
 class RetryPlugin(BasePlugin):
     """重试插件 - 实现操作失败时的自动重试机制"""
+    __slots__ = ('max_retry_times', 'base_delay', 'max_delay', 'jitter', 'original_operation')
+    # 所有插件实例共享，限制同时等待/执行的重试数量；在第一次重试时按当前事件循环创建
+    _retry_semaphore: asyncio.Semaphore | None = None
+    _retry_semaphore_loop: asyncio.AbstractEventLoop | None = None
+    _OPERATIONS = (
+        (PluginMethodType.BEFORE_EXEC, '_setup_retry', "设置重试机制"),
+        (PluginMethodType.ON_ERROR, '_handle_retry', "处理重试逻辑"),
+    )
     
-    def __init__(self, retry_times: int = 3, delay: float = 30.0, **kwargs):
+    def __init__(self, retry_times: int = 3, base_delay: float = 1.0, max_delay: float = 60.0,
+                 jitter: float = 0.5, delay: float | None = None, **kwargs):
+        """
+        Args:
+            retry_times: 最大重试次数
+            base_delay: 首次重试前的等待秒数，之后每次翻倍
+            max_delay: 单次等待的上限秒数
+            jitter: 随机抖动比例，避免多个会话同时重试
+            delay: 已弃用，旧版固定重试间隔参数，传入时作为 base_delay 使用
+        """
         super().__init__(**kwargs)
+        if delay is not None:
+            warnings.warn("RetryPlugin 的 delay 参数已弃用，请改用 base_delay", DeprecationWarning, stacklevel=2)
+            base_delay = delay
         self.max_retry_times = retry_times
-        self.current_retry = 0
-        self.delay = delay
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
         self.original_operation = None
-        
-        # 添加操作到操作链
-        self.add_operation(PluginMethodType.BEFORE_EXEC, self._setup_retry, "设置重试机制")
-        self.add_operation(PluginMethodType.ON_ERROR, self._handle_retry, "处理重试逻辑")
-        self.add_operation(PluginMethodType.ON_SUCCESS, self._reset_retry_count, "重置重试计数")
     
     async def _setup_retry(self):
         """设置重试机制"""
-        self.current_retry = 0
-        self.logger.info(f"[RETRY PLUGIN] 初始化重试机制，最大重试次数: {self.max_retry_times}")
+        # 每次操作前都会执行，降为 debug 并延迟格式化
+        self.logger.opt(lazy=True).debug(
+            "[RETRY PLUGIN] 初始化重试机制，最大重试次数: {}", lambda: self.max_retry_times
+        )
+
+    @classmethod
+    def _get_retry_semaphore(cls) -> asyncio.Semaphore:
+        """获取当前事件循环的重试信号量，事件循环变化（测试、重载）时重新创建"""
+        loop = asyncio.get_running_loop()
+        if cls._retry_semaphore is None or cls._retry_semaphore_loop is not loop:
+            cls._retry_semaphore = asyncio.Semaphore(settings.retry_max_concurrent)
+            cls._retry_semaphore_loop = loop
+        return cls._retry_semaphore
+
+    def _compute_delay(self, attempt: int) -> float:
+        """第 attempt 次重试前的等待时间：指数退避，封顶 max_delay，再叠加随机抖动"""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return delay * (1 + random.random() * self.jitter)
     
     async def _handle_retry(self, operation= None, *args, **kwargs):
-        """处理重试逻辑"""
+        """处理重试逻辑，重试次数为循环局部变量，同一插件实例可被并发使用"""
         if operation:
             self.original_operation = operation
-        
-        if self.current_retry < self.max_retry_times:
-            self.current_retry += 1
-            
+        if not self.original_operation or self.max_retry_times <= 0:
+            return
+
+        retry_semaphore = self._get_retry_semaphore()
+        last_exc = None
+        for attempt in range(1, self.max_retry_times + 1):
+            delay = self._compute_delay(attempt)
             self.logger.warning(
-                f"[RETRY PLUGIN] 第 {self.current_retry}/{self.max_retry_times} 次重试，等待 {self.delay} 秒后执行"
+                f"[RETRY PLUGIN] 第 {attempt}/{self.max_retry_times} 次重试，等待 {delay:.2f} 秒后执行"
             )
-            
-            # 等待延迟时间
-            await asyncio.sleep(self.delay)
-            
-            # 执行重试
-            if self.original_operation:
-                try:
+            try:
+                async with retry_semaphore:
+                    await asyncio.sleep(delay)
                     result = await self.original_operation(*args, **kwargs)
-                    self.logger.info(f"[RETRY PLUGIN] 第 {self.current_retry} 次重试成功")
-                    return result
-                except Exception as e:
-                    self.logger.error(f"[RETRY PLUGIN] 第 {self.current_retry} 次重试失败: {e}")
-                    
-                    # 如果还有重试次数，继续重试
-                    if self.current_retry < self.max_retry_times:
-                        return await self._handle_retry(*args, **kwargs)
-                    else:
-                        self.logger.error(f"[RETRY PLUGIN] 所有重试次数已用完")
-                        raise e
-        else:
-            self.logger.error(f"[RETRY PLUGIN] 重试次数已用完，无法继续重试")
-    
-    async def _reset_retry_count(self):
-        """重置重试计数"""
-        self.current_retry = 0
-        self.logger.debug("[RETRY PLUGIN] 操作成功，重置重试计数")
\ No newline at end of file
+                self.logger.debug("[RETRY PLUGIN] 第 {} 次重试成功", attempt)
+                return result
+            except Exception as e:
+                last_exc = e
+                self.logger.error(f"[RETRY PLUGIN] 第 {attempt} 次重试失败: {e}")
+        self.logger.error(f"[RETRY PLUGIN] 所有重试次数已用完")
+        raise last_exc
@@ -1,21 +1,31 @@
+from functools import lru_cache
+
 from fastapi import APIRouter
 
 from app.config import settings
 from app.models.router.all_routes import RouterInfo
 
+# 启动后不会变化，导入时读取一次
+_CONTROLLER_BASE_PATH = settings.controller_base_path
+
+
+@lru_cache(maxsize=256)
+def _join_router_prefix(router_prefix: str) -> str:
+    # RouterInfo 不可哈希，按 router_prefix 字符串缓存
+    return f"{_CONTROLLER_BASE_PATH}{router_prefix}"
+
 
 def gen_router_prefix(router_info: RouterInfo) -> str:
-    return f"{settings.controller_base_path}{router_info.router_prefix}"
+    return _join_router_prefix(router_info.router_prefix)
 
 
 def gen_api_router(router_info: RouterInfo, dependencies=None) -> APIRouter:
-    router = APIRouter()
-    router.tags = [router_info.version_tag, router_info.router_tag]
-    router.prefix = gen_router_prefix(router_info)
-    # 将认证依赖项应用于所有路由
-    if dependencies:
-        router.dependencies = dependencies
-    return router
+    # 构造时一次性传入 prefix/tags/依赖项，依赖项会应用于所有路由
+    return APIRouter(
+        prefix=gen_router_prefix(router_info),
+        tags=[router_info.version_tag, router_info.router_tag],
+        dependencies=list(dependencies) if dependencies else None,
+    )
 
 
 __all__ = ['gen_api_router']
@@ -2,24 +2,35 @@ from loguru import logger
 
 from app.config import CONF
 
+# 已添加过的日志文件，同名类重复装饰（如模块重新加载）时不再重复添加 sink
+_added_log_files: set[str] = set()
+
 
 def decorator(cls):
     """
     日志类装饰器
 
+    只为类添加按类名命名的错误日志文件并挂载 logger，不包装任何方法，热路径上没有额外开销
+
     Args:
         cls: 要装饰的类
 
     Returns:
         装饰后的类
     """
-    logger.add(
-        f"{CONF.Path.logs}/{cls.__name__}.log",
-        rotation="10 MB",
-        retention="30 days",
-        level="ERROR",
-        enqueue=True,
-        encoding="utf-8"
-    )
-    cls.logger = logger
-    return cls
\ No newline at end of file
+    cls_name = cls.__name__
+    log_file = f"{CONF.Path.logs}/{cls_name}.log"
+    if log_file not in _added_log_files:
+        # 只接收绑定了本类名的记录，其他类和全局 logger 的错误不会再写入每个类的日志文件
+        logger.add(
+            log_file,
+            rotation="10 MB",
+            retention="30 days",
+            level="ERROR",
+            enqueue=True,
+            encoding="utf-8",
+            filter=lambda record: record["extra"].get("cls") == cls_name
+        )
+        _added_log_files.add(log_file)
+    cls.logger = logger.bind(cls=cls_name)
+    return cls
@@ -5,7 +5,7 @@ USE browser_info;
 -- 创建用户浏览器信息表
 CREATE TABLE IF NOT EXISTS user_browser_info (
     id INT AUTO_INCREMENT PRIMARY KEY,
-    browser_token VARCHAR(36) UNIQUE NOT NULL,
+    browser_token BINARY(16) UNIQUE NOT NULL,
     fingerprint INT NOT NULL,
     fingerprint_platform ENUM('windows', 'linux', 'macos') NOT NULL DEFAULT 'windows',
     fingerprint_platform_version VARCHAR(50),
@@ -20,6 +20,5 @@ CREATE TABLE IF NOT EXISTS user_browser_info (
     proxy_server VARCHAR(200),
     created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-    INDEX idx_browser_token (browser_token),
     UNIQUE KEY unique_fingerprint (fingerprint)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
\ No newline at end of file
@@ -4,6 +4,7 @@ import fastapi_cdn_host
 import uvicorn
 import sys
 import asyncio
+from app.models.response import PydanticJSONResponse
 from app.routes import setup_routes
 
 
@@ -30,7 +31,7 @@ async def lifespan(app: FastAPI):
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="Browser Automation API", lifespan=lifespan)
+    app = FastAPI(title="Browser Automation API", lifespan=lifespan, default_response_class=PydanticJSONResponse)
     fastapi_cdn_host.patch_docs(app)
 
     # 设置路由
@@ -46,5 +47,11 @@ if __name__ == "__main__":
         'main:app',
         host="127.0.0.1",
         port=8000,
+        # 非 Windows 平台使用 uvloop（随 uvicorn[standard] 安装），Windows 保持 asyncio 以兼容上面的事件循环策略
+        loop="asyncio" if sys.platform.startswith('win') else "uvloop",
+        http="httptools",
+        # 浏览器会话池、live 会话和验证码模型都保存在进程内，多 worker 会导致同一 browser_token 的请求落到不同进程，只能单进程运行
+        workers=1,
+        backlog=2048,
         reload=False,
     )
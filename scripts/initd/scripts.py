@@ -5,9 +5,16 @@ from app.models.RPA_browser.models import UserBrowserInfo
 
 def create_tables():
     engin = create_engine(
-        url=settings.mysql_browser_info_url.replace('aiomysql', 'pymysql')  # 这里用的是同步创建数据库表的方法，毕竟只需要运行一次
+        url=settings.mysql_browser_info_url.replace('aiomysql', 'pymysql'),  # 这里用的是同步创建数据库表的方法，毕竟只需要运行一次
+        pool_size=1,
+        max_overflow=0,
     )
-    SQLModel.metadata.create_all(engin)
+    try:
+        # 表检查和所有建表语句复用同一个连接
+        with engin.begin() as conn:
+            SQLModel.metadata.create_all(conn, checkfirst=True)
+    finally:
+        engin.dispose()
 
 
 if __name__ == '__main__':
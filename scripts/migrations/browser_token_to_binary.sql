@@ -0,0 +1,9 @@
+USE browser_info;
+
+-- 将 browser_token 由字符串 UUID 转为 BINARY(16)
+-- 兼容带横线(36位)和不带横线(32位)的十六进制字符串
+ALTER TABLE user_browser_info ADD COLUMN browser_token_bin BINARY(16) NULL AFTER browser_token;
+UPDATE user_browser_info SET browser_token_bin = UNHEX(REPLACE(browser_token, '-', ''));
+ALTER TABLE user_browser_info DROP COLUMN browser_token;
+ALTER TABLE user_browser_info CHANGE COLUMN browser_token_bin browser_token BINARY(16) NOT NULL;
+ALTER TABLE user_browser_info ADD UNIQUE KEY unique_browser_token (browser_token);